@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """Agent Zero Autonomous Evolution - sam generiše, testira, puši."""
-import sys, os, time, json, subprocess, base64, re, urllib.request
+import ast, hashlib, sys, os, time, json, subprocess, re, random, resource, signal, threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from math import erfc, sqrt
 from pathlib import Path
+from statistics import median
 
 WORKSPACE = Path("/mnt/user-data/outputs/real_replication")
-GITHUB_TOKEN = "os.environ["GITHUB_TOKEN"]"
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
 GITHUB_OWNER = "pistakugli"
 GITHUB_REPO = "agent-zero-self-replication"
+ROOT = Path(__file__).resolve().parent
 
 # ============================================================
 # SCAN
@@ -23,72 +28,231 @@ def scan():
     return gens
 
 # ============================================================
-# ANALYZE
+# ANALYZE (AST, cached by content hash)
 # ============================================================
-def analyze(gens):
-    result = {}
+ANALYZER_VERSION = 1            # bump when features() changes; old index entries are dropped
+INDEX_FILE = ".analysis_index.json"
+_CACHE_DECORATORS = {"lru_cache", "cache", "_result_cache", "sharded_cache", "window_cache"}
+
+def _name(node):
+    """Bare name of a decorator or call target: lru_cache, functools.lru_cache(...) -> lru_cache."""
+    if isinstance(node, ast.Call): node = node.func
+    if isinstance(node, ast.Attribute): return node.attr
+    return node.id if isinstance(node, ast.Name) else None
+
+def _ints(node):
+    """A tuple of int literals as a tuple, else None."""
+    if isinstance(node, ast.Tuple) and node.elts and all(
+            isinstance(e, ast.Constant) and type(e.value) is int for e in node.elts):
+        return tuple(e.value for e in node.elts)
+    return None
+
+def _loop_shape(node):
+    """for: what it iterates (range step, literal tuple, callee); while: the
+    constant steps it adds to a counter ("while +=6")."""
+    if isinstance(node, ast.For):
+        it = node.iter
+        if isinstance(it, ast.Call) and _name(it) == "range":
+            step = it.args[2] if len(it.args) == 3 else None
+            return f"for range/{step.value}" if isinstance(step, ast.Constant) else \
+                "for range/var" if step else "for range"
+        return "for tuple" if _ints(it) else f"for {_name(it) or type(it).__name__.lower()}"
+    steps = sorted({n.value.value for n in ast.walk(node) if isinstance(n, ast.AugAssign)
+                    and isinstance(n.op, ast.Add) and isinstance(n.value, ast.Constant)
+                    and type(n.value.value) is int})
+    return "while " + " ".join(f"+={k}" for k in steps) if steps else "while"
+
+def features(code):
+    """Structural facts about one generation, from its AST: decorators,
+    function signatures, classes, the sieve limit, Miller-Rabin witness
+    tuples, loop shapes, plus the feature flags and algo label used by
+    decide_and_generate. Comments and strings never count."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return dict(error=f"SyntaxError: {e.msg} (line {e.lineno})", cache=False, sieve=False,
+                    mr=False, wheel=False, extended=False, segmented=False, algo="Broken")
+    decorators, functions, classes, witnesses, loops, names = [], [], [], [], Counter(), set()
+    sieve_limit, modpow = None, False
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.append(f"{node.name}({', '.join(a.arg for a in node.args.args)})")
+            decorators += [d for d in map(_name, node.decorator_list) if d]
+            names.add(node.name)
+        elif isinstance(node, ast.ClassDef):
+            classes.append(node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if not isinstance(target, ast.Name): continue
+                if target.id == "_SIEVE_LIMIT":
+                    # a literal, or the default of int(os.environ.get(..., default))
+                    found = [n.value for n in ast.walk(node.value)
+                             if isinstance(n, ast.Constant) and type(n.value) is int]
+                    sieve_limit = max(found, default=None)
+                elif "witness" in target.id.lower() and _ints(node.value):
+                    witnesses.append(_ints(node.value))
+        elif isinstance(node, (ast.For, ast.While)):
+            loops[_loop_shape(node)] += 1
+            if isinstance(node, ast.For) and _ints(node.iter) and _ints(node.iter)[0] == 2:
+                witnesses.append(_ints(node.iter))          # for a in (2, 3, 5, 7)
+        elif isinstance(node, ast.Call) and _name(node) == "pow" and len(node.args) == 3:
+            modpow = True
+        elif isinstance(node, ast.Name): names.add(node.id)
+        elif isinstance(node, ast.Attribute): names.add(node.attr)
+    witnesses = sorted(set(witnesses), key=len)
+    r = dict(
+        decorators=decorators, functions=functions, classes=classes, sieve_limit=sieve_limit,
+        witnesses=[list(w) for w in witnesses], loops=dict(loops),
+        cache=bool(_CACHE_DECORATORS & set(decorators)) or any("cache" in n.lower() for n in names),
+        sieve=sieve_limit is not None or any("sieve" in f.lower() for f in functions),
+        mr=modpow,
+        wheel=any(shape.endswith("/6") or "+=6" in shape.split() for shape in loops),
+        extended=any(len(w) >= 12 for w in witnesses),
+        segmented=any(f.startswith("primes_in_range(") for f in functions),
+    )
+    if r["segmented"]: algo = "Segmented+SOTA"
+    elif r["extended"]: algo = "Extended SOTA"
+    elif r["mr"] and r["sieve"] and r["cache"]: algo = "SOTA"
+    elif r["mr"] and r["sieve"]: algo = "Sieve+MR"
+    elif r["mr"]: algo = "Miller-Rabin"
+    elif r["cache"]: algo = "Cached"
+    elif r["wheel"]: algo = "Wheel"
+    else: algo = "Trial"
+    r["algo"] = algo
+    return r
+
+def _load_index():
+    try:
+        index = json.loads((WORKSPACE / INDEX_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+    return index["entries"] if index.get("version") == ANALYZER_VERSION else {}
+
+def analyze(gens, quiet=False):
+    """features() for every generation, looked up by the SHA-256 of its
+    source in WORKSPACE/.analysis_index.json and parsed only on a miss."""
+    index = _load_index()
+    misses, result = 0, {}
     for n, g in gens.items():
-        c = g["code"]
-        result[n] = {
-            "cache":    "lru_cache" in c or "cache" in c.lower(),
-            "sieve":    "_SIEVE" in c or "sieve" in c.lower(),
-            "mr":       "pow(a, d, n)" in c,
-            "wheel":    "i += 6" in c,
-            "extended": "_WITNESSES" in c or "1_000_000" in c,
-            "segmented":"primes_in_range" in c,
-        }
-        # Determine algo label
-        r = result[n]
-        if r["segmented"]: algo = "Segmented+SOTA"
-        elif r["extended"]: algo = "Extended SOTA"
-        elif r["mr"] and r["sieve"] and r["cache"]: algo = "SOTA"
-        elif r["mr"] and r["sieve"]: algo = "Sieve+MR"
-        elif r["mr"]: algo = "Miller-Rabin"
-        elif r["cache"]: algo = "Cached"
-        elif r["wheel"]: algo = "Wheel"
-        else: algo = "Trial"
-        result[n]["algo"] = algo
-        print(f"   Gen{n}: {algo}")
+        key = hashlib.sha256(g["code"].encode()).hexdigest()
+        if key not in index:
+            index[key] = features(g["code"])
+            misses += 1
+        result[n] = dict(index[key])
+        if not quiet: print(f"   Gen{n}: {result[n]['algo']}")
+    if misses:
+        WORKSPACE.mkdir(parents=True, exist_ok=True)
+        tmp = WORKSPACE / (INDEX_FILE + ".tmp")
+        tmp.write_text(json.dumps(dict(version=ANALYZER_VERSION, entries=index)))
+        tmp.replace(WORKSPACE / INDEX_FILE)
     return result
 
 # ============================================================
 # DECIDE + GENERATE
 # ============================================================
-def decide_and_generate(analysis):
+def decide_and_generate(analysis, variants=1, history=(), incumbent=None):
+    """Candidate files for the next generation, or [] when nothing is left.
+
+    The first LADDER step that adds what the top generation lacks is taken,
+    skipping steps the fitness history already rejected against the same
+    incumbent. Knob values are drawn with weights learned from the history."""
     max_gen = max(analysis.keys())
     top = analysis[max_gen]
     next_gen = max_gen + 1
 
-    if not top["mr"]:
-        print(f"   💭 Nema MR → Miller-Rabin")
-        return write_file(next_gen, "miller_rabin", CODE_MILLER_RABIN)
-    elif top["mr"] and not top["sieve"]:
-        print(f"   💭 Ima MR, nema sieve → Sieve+MR")
-        return write_file(next_gen, "sieve_mr", CODE_SIEVE_MR)
-    elif top["mr"] and top["sieve"] and not top["cache"]:
-        print(f"   💭 Ima MR+sieve, nema cache → SOTA")
-        return write_file(next_gen, "cached_sota", CODE_CACHED_SOTA)
-    elif top["mr"] and top["sieve"] and top["cache"] and not top["extended"]:
-        print(f"   💭 Ima SOTA → Extended (sieve 1M, 12 witnesses)")
-        return write_file(next_gen, "extended", CODE_EXTENDED)
-    elif top["extended"] and not top["segmented"]:
-        print(f"   💭 Extended → Segmented sieve (range queries)")
-        return write_file(next_gen, "segmented", CODE_SEGMENTED)
-    else:
-        print(f"   💭 Fully evolved - nema šta novo")
-        return None
-
-def write_file(gen, label, template):
-    code = template.format(gen=gen)
-    name = f"gen{gen}_{label}.py"
-    filepath = WORKSPACE / name
-    filepath.write_text(code)
-    print(f"   ✓ {name} ({len(code.splitlines())} lines)")
-    return filepath
+    rejected = {r["template"] for r in history if r["incumbent"] == incumbent and not r["accepted"]}
+    start = next((i for i, step in enumerate(LADDER) if step[3](top)), len(LADDER))
+    for label, template, note, _ in LADDER[start:]:
+        if label in rejected:
+            print(f"   💭 {label}: odbijen protiv {incumbent} → preskačem")
+            continue
+        print(f"   💭 {note}")
+        return write_candidates(next_gen, label, template, variants, knob_weights(history))
+    print(f"   💭 Fully evolved - nema šta novo")
+    return []
+
+# Tunables re-drawn across the candidates of one generation: (name, pattern, values).
+KNOBS = (
+    ("sieve_limit", r"_SIEVE_LIMIT = ([\d_]+)", ("100_000", "1_000_000", "4_000_000")),
+    ("cache_size", r"maxsize=(\d+)", ("4096", "16384", "65536")),
+    ("small_primes", r"_SMALL_PRIMES = tuple\(i for i in range\(2, (\d+)\)", ("100", "200", "1000")),
+)
+
+def knobs(code):
+    """{knob name: value} for the KNOBS present in code."""
+    found = ((name, re.search(pattern, code)) for name, pattern, _ in KNOBS)
+    return {name: m.group(1) for name, m in found if m}
+
+def knob_weights(history):
+    """Sampling weight per (knob, value): 1, plus 3 for each accepted candidate
+    that used it and 1 for each that beat its incumbent without significance."""
+    weights = Counter()
+    for record in history:
+        for c in record["candidates"]:
+            bonus = 3 if c["file"] == record["accepted"] else 1 if c.get("gain", 0) > 0 else 0
+            for name, value in c["knobs"].items(): weights[name, value] += bonus
+    return weights
+
+def mutate(code, count, seed, weights=None):
+    """code plus up to count - 1 distinct copies with the KNOBS values re-drawn."""
+    rng = random.Random(seed)
+    weights = weights or {}
+    out = [code]
+    for _ in range(8 * count):
+        if len(out) >= count: break
+        variant = code
+        for name, pattern, values in KNOBS:
+            value = rng.choices(values, [1 + weights.get((name, v), 0) for v in values])[0]
+            variant = re.sub(pattern, lambda m: m.group(0).replace(m.group(1), value), variant)
+        if variant not in out: out.append(variant)
+    return out
+
+def write_candidates(gen, label, template, variants=1, weights=None):
+    """Write the template and its mutations to WORKSPACE/candidates/genN_label_vK.py."""
+    folder = WORKSPACE / "candidates"
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for k, code in enumerate(mutate(template.format(gen=gen), variants, gen, weights)):
+        filepath = folder / f"gen{gen}_{label}_v{k}.py"
+        filepath.write_text(code)
+        paths.append(filepath)
+    print(f"   ✓ {len(paths)} candidate(s) gen{gen}_{label}_v*.py")
+    return paths
+
+def promote(filepath):
+    """Copy a winning candidate to WORKSPACE as genN_label.py."""
+    target = WORKSPACE / re.sub(r"_v\d+$", "", filepath.stem)
+    target = target.with_suffix(".py")
+    target.write_text(filepath.read_text())
+    print(f"   ✓ {target.name} ({len(target.read_text().splitlines())} lines)")
+    return target
 
 # ============================================================
 # CODE TEMPLATES
 # ============================================================
+# Odd-only bit sieve shared by every sieve template: 1 bit per odd number.
+SIEVE_BLOCK = '''from math import isqrt
+
+_BIT_TABLES = [bytes([0, 1 << k]) + bytes(254) for k in range(8)]
+
+def _build_sieve(limit):
+    size = (limit + 1) // 2
+    s = bytearray(b'\\x01') * size + bytes(-size % 8)
+    s[0] = 0
+    for i in range(1, (isqrt(limit) - 1) // 2 + 1):
+        if s[i]:
+            j = 2 * i * (i + 1)
+            s[j:size:2*i+1] = bytes(len(range(j, size, 2*i+1)))
+    acc = 0
+    for k, table in enumerate(_BIT_TABLES):
+        acc |= int.from_bytes(s[k::8].translate(table), 'little')
+    return acc.to_bytes(len(s) >> 3, 'little')
+
+def _sieve_has(n):
+    if n & 1: return (_SIEVE[n >> 4] >> (n >> 1 & 7)) & 1 == 1
+    return n == 2
+'''
+
 CODE_MILLER_RABIN = '''#!/usr/bin/env python3
 """Gen{gen} - Deterministic Miller-Rabin. Agent Zero generated."""
 _SMALL = (2,3,5,7,11,13,17,19,23,29,31,37,41,43,47)
@@ -127,16 +291,10 @@ if __name__ == "__main__":
 CODE_SIEVE_MR = '''#!/usr/bin/env python3
 """Gen{gen} - Sieve 100k + Miller-Rabin. Agent Zero generated."""
 
-def _build_sieve(limit):
-    s = bytearray(b'\\x01') * (limit + 1)
-    s[0] = s[1] = 0
-    for i in range(2, int(limit**0.5) + 1):
-        if s[i]: s[i*i::i] = bytearray(len(s[i*i::i]))
-    return s
-
+''' + SIEVE_BLOCK + '''
 _SIEVE_LIMIT = 100_000
 _SIEVE = _build_sieve(_SIEVE_LIMIT)
-_SMALL_PRIMES = tuple(i for i in range(2, 200) if _SIEVE[i])
+_SMALL_PRIMES = tuple(i for i in range(2, 200) if _sieve_has(i))
 
 def _miller_rabin(n):
     r, d = 0, n - 1
@@ -153,7 +311,7 @@ def _miller_rabin(n):
 
 def is_prime(n):
     if n <= _SIEVE_LIMIT:
-        return bool(_SIEVE[n]) if n >= 0 else False
+        return _sieve_has(n) if n >= 0 else False
     for p in _SMALL_PRIMES:
         if n % p == 0: return n == p
     return _miller_rabin(n)
@@ -176,16 +334,10 @@ CODE_CACHED_SOTA = '''#!/usr/bin/env python3
 """Gen{gen} - Sieve + LRU Cache + Miller-Rabin SOTA. Agent Zero generated."""
 from functools import lru_cache
 
-def _build_sieve(limit):
-    s = bytearray(b'\\x01') * (limit + 1)
-    s[0] = s[1] = 0
-    for i in range(2, int(limit**0.5) + 1):
-        if s[i]: s[i*i::i] = bytearray(len(s[i*i::i]))
-    return s
-
+''' + SIEVE_BLOCK + '''
 _SIEVE_LIMIT = 100_000
 _SIEVE = _build_sieve(_SIEVE_LIMIT)
-_SMALL_PRIMES = tuple(i for i in range(2, 200) if _SIEVE[i])
+_SMALL_PRIMES = tuple(i for i in range(2, 200) if _sieve_has(i))
 
 def _miller_rabin(n):
     r, d = 0, n - 1
@@ -203,7 +355,7 @@ def _miller_rabin(n):
 @lru_cache(maxsize=8192)
 def is_prime(n):
     if n <= _SIEVE_LIMIT:
-        return bool(_SIEVE[n]) if n >= 0 else False
+        return _sieve_has(n) if n >= 0 else False
     for p in _SMALL_PRIMES:
         if n % p == 0: return n == p
     return _miller_rabin(n)
@@ -224,19 +376,15 @@ if __name__ == "__main__":
 '''
 
 CODE_EXTENDED = '''#!/usr/bin/env python3
-"""Gen{gen} - Extended SOTA: sieve 1M, 12 witnesses valid to 3.3e24. Agent Zero generated."""
+"""Gen{gen} - Extended SOTA: sieve 1M, 12 witnesses valid to 3.1e23. Agent Zero generated."""
 from functools import lru_cache
+from math import gcd, prod
 
-def _build_sieve(limit):
-    s = bytearray(b'\\x01') * (limit + 1)
-    s[0] = s[1] = 0
-    for i in range(2, int(limit**0.5) + 1):
-        if s[i]: s[i*i::i] = bytearray(len(s[i*i::i]))
-    return s
-
+''' + SIEVE_BLOCK + '''
 _SIEVE_LIMIT = 1_000_000
 _SIEVE = _build_sieve(_SIEVE_LIMIT)
-_SMALL_PRIMES = tuple(i for i in range(2, 1000) if _SIEVE[i])
+_SMALL_PRIMES = tuple(i for i in range(2, 1000) if _sieve_has(i))
+_SMALL_PRODUCT = prod(_SMALL_PRIMES[:50])
 _WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
 
 def _miller_rabin(n):
@@ -255,9 +403,8 @@ def _miller_rabin(n):
 @lru_cache(maxsize=16384)
 def is_prime(n):
     if n <= _SIEVE_LIMIT:
-        return bool(_SIEVE[n]) if n >= 0 else False
-    for p in _SMALL_PRIMES[:50]:
-        if n % p == 0: return n == p
+        return _sieve_has(n) if n >= 0 else False
+    if not n & 1 or gcd(n, _SMALL_PRODUCT) != 1: return False
     return _miller_rabin(n)
 
 if __name__ == "__main__":
@@ -287,17 +434,13 @@ New: primes_in_range(low, high) - find ALL primes in range efficiently.
 Segmented sieve O((high-low)*log(log(high))) vs checking each number individually.
 """
 from functools import lru_cache
+from math import gcd, prod
 
-def _build_sieve(limit):
-    s = bytearray(b'\\x01') * (limit + 1)
-    s[0] = s[1] = 0
-    for i in range(2, int(limit**0.5) + 1):
-        if s[i]: s[i*i::i] = bytearray(len(s[i*i::i]))
-    return s
-
+''' + SIEVE_BLOCK + '''
 _SIEVE_LIMIT = 1_000_000
 _SIEVE = _build_sieve(_SIEVE_LIMIT)
-_BASE_PRIMES = [i for i in range(2, 1001) if _SIEVE[i]]
+_BASE_PRIMES = [i for i in range(2, 1001) if _sieve_has(i)]
+_SMALL_PRODUCT = prod(_BASE_PRIMES[:50])
 _WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
 
 def _miller_rabin(n):
@@ -316,9 +459,8 @@ def _miller_rabin(n):
 @lru_cache(maxsize=16384)
 def is_prime(n):
     if n <= _SIEVE_LIMIT:
-        return bool(_SIEVE[n]) if n >= 0 else False
-    for p in _BASE_PRIMES[:50]:
-        if n % p == 0: return n == p
+        return _sieve_has(n) if n >= 0 else False
+    if not n & 1 or gcd(n, _SMALL_PRODUCT) != 1: return False
     return _miller_rabin(n)
 
 def primes_in_range(low, high):
@@ -366,61 +508,222 @@ if __name__ == "__main__":
     print(f"Gen{gen} seg_sieve: {{t_seg:.4f}}s (100x [1M-1.1M], {{count}} primes)")
 '''
 
+# Evolution order: (label, template, note, needs) - needs(top) is true when
+# the step adds something the top generation lacks.
+LADDER = (
+    ("miller_rabin", CODE_MILLER_RABIN, "Nema MR → Miller-Rabin", lambda t: not t["mr"]),
+    ("sieve_mr", CODE_SIEVE_MR, "Ima MR, nema sieve → Sieve+MR", lambda t: not t["sieve"]),
+    ("cached_sota", CODE_CACHED_SOTA, "Ima MR+sieve, nema cache → SOTA", lambda t: not t["cache"]),
+    ("extended", CODE_EXTENDED, "Ima SOTA → Extended (sieve 1M, 12 witnesses)",
+     lambda t: not t["extended"]),
+    ("segmented", CODE_SEGMENTED, "Extended → Segmented sieve (range queries)",
+     lambda t: not t["segmented"]),
+)
+
 # ============================================================
-# TEST
+# TEST (parallel, time-boxed)
 # ============================================================
-def test(filepath):
-    print(f"\n🧪 Test: {filepath.name}")
-    result = subprocess.run(
-        ["python3", str(filepath)],
-        capture_output=True, text=True, timeout=60
-    )
-    if result.returncode == 0:
-        print(f"   ✓ {result.stdout.strip()}")
-        return True
+CPU_LIMIT = 60                  # CPU seconds per candidate run (RLIMIT_CPU)
+MEM_LIMIT = 1 << 30             # bytes of address space per candidate run (RLIMIT_AS)
+_TIMING = re.compile(r"([A-Za-z][\w ]*?):\s*([\d.]+)s\b")
+
+def _limits(cpu, mem):
+    def apply():                # runs in the child between fork and exec
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+        if mem: resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
+    return apply
+
+def _parse(line, result):
+    """Fold one line of candidate output into result: "✓ ..." lines are
+    passed checks, "Gen7 unique: 0.0012s" style fields are timings."""
+    if line.startswith("✓"): result["checks"].append(line[1:].strip())
+    for label, seconds in _TIMING.findall(line):
+        label = re.sub(r"^Gen\d+\s*", "", label).strip() or "repeated"
+        result["timings"][label] = float(seconds)
+
+# Standard fitness workload: the README's repeated case (10 numbers x 100),
+# then 100 fresh numbers around 10^6 and 100 around 10^9.
+FITNESS_WORKLOAD = ([2, 17, 97, 1009, 9973, 104729, 999983, 1299709, 15485863, 32452843] * 100
+                    + list(range(999_950, 1_000_050)) + list(range(10**9 - 50, 10**9 + 50)))
+
+# Runs in the candidate's own limited interpreter: time `samples` passes over
+# the workload (caches cleared before each) and print them as one JSON line.
+FITNESS_HARNESS = """
+import importlib.util, json, sys, time
+sys.path.insert(0, sys.argv[1])
+from final_benchmark import _entry_points
+spec = importlib.util.spec_from_file_location("candidate", sys.argv[2])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+check, _, reset = _entry_points(module)
+workload = json.loads(sys.argv[3])
+samples = []
+for _ in range(int(sys.argv[4])):
+    reset()
+    start = time.perf_counter_ns()
+    for n in workload: check(n)
+    samples.append((time.perf_counter_ns() - start) / 1e9)
+print(json.dumps({"samples": samples}))
+"""
+
+def _run(argv, cwd, cpu, mem, on_line):
+    """Run argv under the limits, feeding each output line to on_line.
+    Returns (exit code, rusage, last output lines)."""
+    tail = deque(maxlen=5)
+    proc = subprocess.Popen(argv, cwd=cwd, text=True, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, preexec_fn=_limits(cpu, mem))
+    # RLIMIT_CPU does not fire for a candidate blocked on sleep or I/O.
+    watchdog = threading.Timer(2 * cpu + 5, proc.kill)
+    watchdog.start()
+    for line in proc.stdout:
+        line = line.strip()
+        on_line(line)
+        if line: tail.append(line)
+    # Stop the watchdog before reaping: once wait4 returns, the pid can be reused.
+    watchdog.cancel()
+    watchdog.join()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode, usage, tail
+
+def evaluate(filepath, cpu=CPU_LIMIT, mem=MEM_LIMIT, samples=0):
+    """Run one candidate under CPU and memory limits, parsing its output as
+    it streams. With samples > 0 a passing candidate is then timed on
+    FITNESS_WORKLOAD; fitness is queries per second at the median sample.
+    Returns a plain dict."""
+    filepath = Path(filepath)
+    result = dict(file=str(filepath), ok=False, returncode=None, signal=None, checks=[],
+                  timings={}, samples=[], fitness=None, wall=0.0, cpu=0.0, maxrss_mb=0.0,
+                  error="")
+    start = time.perf_counter()
+    runs = [([sys.executable, str(filepath)], lambda line: _parse(line, result))]
+    if samples:
+        def collect(line):
+            if line.startswith("{"): result["samples"] = json.loads(line)["samples"]
+        runs.append(([sys.executable, "-c", FITNESS_HARNESS, str(ROOT), str(filepath),
+                      json.dumps(FITNESS_WORKLOAD), str(samples)], collect))
+    for argv, on_line in runs:
+        code, usage, tail = _run(argv, filepath.parent, cpu, mem, on_line)
+        result.update(returncode=code, cpu=result["cpu"] + usage.ru_utime + usage.ru_stime,
+                      maxrss_mb=max(result["maxrss_mb"], usage.ru_maxrss / 1024))
+        if code != 0:
+            if code < 0: result["signal"] = signal.Signals(-code).name
+            result["error"] = result["signal"] or (tail[-1] if tail else f"exit {code}")
+            break
     else:
-        print(f"   ✗ {result.stderr.strip()}")
-        return False
+        result["ok"] = True
+        if result["samples"]: result["fitness"] = len(FITNESS_WORKLOAD) / median(result["samples"])
+    result["wall"] = time.perf_counter() - start
+    return result
+
+def evaluate_all(paths, workers=None, cpu=CPU_LIMIT, mem=MEM_LIMIT, samples=0):
+    """Evaluate candidates concurrently; yields each result as it finishes.
+    Each candidate runs in its own subprocess, so threads only wait on them.
+    Timings are only comparable with one candidate per core."""
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    with ThreadPoolExecutor(workers) as pool:
+        futures = [pool.submit(evaluate, path, cpu, mem, samples) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+# ============================================================
+# SELECT (fitness)
+# ============================================================
+HISTORY_FILE = "fitness_history.json"
+
+def mann_whitney(a, b):
+    """One-sided Mann-Whitney U p-value for "samples a tend to be smaller than
+    b" (normal approximation with tie and continuity correction)."""
+    n1, n2 = len(a), len(b)
+    values = sorted(a + b)
+    ranks, i = {}, 0
+    while i < len(values):
+        j = i
+        while j < len(values) and values[j] == values[i]: j += 1
+        ranks[values[i]] = (i + j + 1) / 2          # average 1-based rank of the tie
+        i = j
+    u = sum(ranks[x] for x in a) - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    ties = sum(t ** 3 - t for t in Counter(values).values())
+    sigma = sqrt(n1 * n2 / 12 * (n + 1 - ties / (n * (n - 1))))
+    if sigma == 0: return 1.0
+    z = (u - n1 * n2 / 2 + 0.5) / sigma
+    return 0.5 * erfc(-z / sqrt(2))
+
+def select(incumbent, results, alpha=0.05, min_gain=0.02):
+    """Fitness record for one generation. A candidate is accepted only if its
+    workload times are lower than the incumbent's with p < alpha and its
+    median beats the incumbent's by at least min_gain; the fittest such
+    candidate wins."""
+    record = dict(incumbent=Path(incumbent["file"]).name, incumbent_fitness=incumbent["fitness"],
+                  candidates=[], accepted=None)
+    best = None
+    for r in results:
+        path = Path(r["file"])
+        entry = dict(file=path.name, knobs=knobs(path.read_text()), ok=r["ok"],
+                     fitness=r["fitness"], error=r["error"])
+        if r["ok"] and r["samples"]:
+            entry["gain"] = median(incumbent["samples"]) / median(r["samples"]) - 1
+            entry["p"] = mann_whitney(r["samples"], incumbent["samples"])
+            if entry["p"] < alpha and entry["gain"] >= min_gain \
+                    and (best is None or r["fitness"] > best["fitness"]):
+                best = entry
+        record["candidates"].append(entry)
+    if best: record["accepted"] = best["file"]
+    return record
+
+def load_history():
+    path = WORKSPACE / HISTORY_FILE
+    return json.loads(path.read_text()) if path.exists() else []
+
+def save_history(history):
+    (WORKSPACE / HISTORY_FILE).write_text(json.dumps(history, indent=1))
 
 # ============================================================
 # GITHUB PUSH
 # ============================================================
-def push(filepath):
-    print(f"\n⬆️  Push: {filepath.name}")
-    content = base64.b64encode(filepath.read_bytes()).decode()
-    url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{filepath.name}"
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github.v3+json",
-        "Content-Type": "application/json"
-    }
-    # Check SHA
-    sha = None
-    try:
-        req = urllib.request.Request(url, headers={k:v for k,v in headers.items() if k != "Content-Type"})
-        resp = urllib.request.urlopen(req)
-        sha = json.loads(resp.read())["sha"]
-    except: pass
-
-    data = json.dumps({
-        "message": f"Agent Zero evolved: {filepath.name}",
-        "content": content,
-        **({"sha": sha} if sha else {})
-    }).encode()
-
-    req = urllib.request.Request(url, data=data, headers=headers, method="PUT")
+def push(paths, artifacts=None, api="https://api.github.com"):
+    """Publish the accepted generations plus {repo path: bytes} artifacts as
+    one commit over one kept-alive connection (git_publish.Publisher)."""
+    from git_publish import Publisher, PublishError
+
+    files = {p.name: p.read_bytes() for p in paths}
+    files.update(artifacts or {})
+    print(f"\n⬆️  Push: {len(paths)} generation(s), {len(files) - len(paths)} artifact(s)")
+    names = ", ".join(p.stem for p in paths) or "artifacts"
     try:
-        urllib.request.urlopen(req)
-        print(f"   ✓ https://github.com/{GITHUB_OWNER}/{GITHUB_REPO}")
-        return True
-    except Exception as e:
+        with Publisher(GITHUB_OWNER, GITHUB_REPO, GITHUB_TOKEN, api=api) as pub:
+            sha = pub.commit(files, f"Agent Zero evolved: {names}")
+    except (PublishError, OSError) as e:
         print(f"   ✗ {e}")
         return False
+    print(f"   ✓ {sha[:12]} ({pub.stats['requests']} requests, {pub.stats['retries']} retries)")
+    return True
 
 # ============================================================
 # MAIN
 # ============================================================
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workspace", type=Path, default=WORKSPACE)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--variants", type=int, default=os.cpu_count() or 1,
+                        help="candidates generated and tested per generation")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: cores)")
+    parser.add_argument("--cpu-limit", type=int, default=CPU_LIMIT, help="CPU seconds per run")
+    parser.add_argument("--mem-limit", type=int, default=MEM_LIMIT >> 20, help="MiB per run")
+    parser.add_argument("--samples", type=int, default=15, help="fitness samples per candidate")
+    parser.add_argument("--alpha", type=float, default=0.05, help="significance level")
+    parser.add_argument("--min-gain", type=float, default=0.02, help="minimum median speedup")
+    parser.add_argument("--json", type=Path, help="write every candidate result here")
+    parser.add_argument("--no-push", action="store_true")
+    parser.add_argument("--api", default="https://api.github.com",
+                        help="GitHub API base URL (e.g. a git_publish stand-in)")
+    args = parser.parse_args()
+    WORKSPACE = args.workspace
+
     print("=" * 60)
     print("AGENT ZERO AUTONOMOUS EVOLUTION")
     print("=" * 60)
@@ -432,31 +735,54 @@ if __name__ == "__main__":
     analysis = analyze(gens)
 
     print("\n🧬 Evolution:")
-    for i in range(5):
+    history, runs, accepted = load_history(), [], []
+    incumbent = gens[max(gens)]["file"]
+    for i in range(args.generations):
         print(f"\n{'─'*60}")
-        filepath = decide_and_generate(analysis)
-        if filepath is None:
+        candidates = decide_and_generate(analysis, args.variants, history, incumbent.name)
+        if not candidates:
             print("   Fully evolved - stop.")
             break
 
-        if test(filepath):
-            push(filepath)
-            # Update analysis
-            code = filepath.read_text()
-            num = max(analysis.keys()) + 1
-            analysis[num] = {
-                "cache":    "lru_cache" in code,
-                "sieve":    "_SIEVE" in code,
-                "mr":       "pow(a, d, n)" in code,
-                "wheel":    "i += 6" in code,
-                "extended": "_WITNESSES" in code or "1_000_000" in code,
-                "segmented":"primes_in_range" in code,
-                "algo":     "evolved"
-            }
-        else:
-            print("   ⚠ Failed - stop.")
+        print(f"\n🧪 Test: {len(candidates)} candidate(s) vs {incumbent.name}")
+        start = time.perf_counter()
+        results = {}
+        for r in evaluate_all([incumbent, *candidates], args.workers, args.cpu_limit,
+                              args.mem_limit << 20, args.samples):
+            results[r["file"]] = r
+            name = Path(r["file"]).name
+            if r["ok"]:
+                print(f"   ✓ {name}: {r['fitness']:,.0f} q/s {r['timings']} "
+                      f"({r['cpu']:.1f}s CPU, {r['maxrss_mb']:.0f} MiB)")
+            else:
+                print(f"   ✗ {name}: {r['error']}")
+        print(f"   ⏱  {time.perf_counter() - start:.1f}s wall for the generation")
+        runs.append(list(results.values()))
+        base = results.pop(str(incumbent))
+        if not base["ok"]:
+            print(f"   ⚠ {incumbent.name} failed - stop.")
             break
 
+        record = select(base, results.values(), args.alpha, args.min_gain)
+        record.update(gen=max(analysis) + 1, template=re.sub(r"^gen\d+_|_v\d+$", "", candidates[0].stem))
+        history.append(record)
+        save_history(history)
+        for c in record["candidates"]:
+            if "gain" in c: print(f"   📈 {c['file']}: {c['gain']:+.1%} (p = {c['p']:.3g})")
+        if record["accepted"] is None:
+            print(f"   ✗ Nijedan kandidat nije značajno brži od {incumbent.name}")
+            continue
+
+        filepath = promote(WORKSPACE / "candidates" / record["accepted"])
+        accepted.append(filepath)
+        incumbent = filepath
+        num = max(analysis.keys()) + 1
+        analysis.update(analyze({num: {"file": filepath, "code": filepath.read_text()}}))
+
+    if args.json: args.json.write_text(json.dumps(runs, indent=1))
+    if accepted and not args.no_push:
+        push(accepted, {"evolution/fitness_history.json": json.dumps(history, indent=1).encode(),
+                        "evolution/last_run.json": json.dumps(runs, indent=1).encode()}, args.api)
     print(f"\n{'=' * 60}")
     print("✅ DONE")
     print(f"{'=' * 60}")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Batch vs scalar is_prime - gen11 is_prime_many against a per-call loop.
+
+Usage: python3 benchmarks/batch.py [sizes...]   (default 10^4 10^6 10^7)
+Inputs are seeded random IDs below 10^9, so they mix sieve lookups,
+small-prime rejections and Miller-Rabin survivors.
+"""
+import random, sys, time
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+
+sizes = [int(float(a)) for a in sys.argv[1:]] or [10**4, 10**6, 10**7]
+rng = random.Random(11)
+
+print(f"  {'N':>10} {'scalar':>10} {'batch':>10} {'numpy':>10} {'speedup':>8}")
+for size in sizes:
+    ids = array('Q', (rng.randrange(10**9) for _ in range(size)))
+
+    g.is_prime.cache_clear()
+    start = time.perf_counter()
+    ref = bytearray(g.is_prime(n) for n in ids)
+    t_scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = g.is_prime_many(ids)
+    t_batch = time.perf_counter() - start
+    assert got == ref, "batch mismatch"
+
+    t_np = float("nan")
+    if g._np is not None:
+        arr = g._np.frombuffer(ids, dtype=g._np.uint64)
+        start = time.perf_counter()
+        got = g.is_prime_many(arr)
+        t_np = time.perf_counter() - start
+        assert bytes(got.astype(g._np.uint8)) == bytes(ref), "numpy mismatch"
+
+    best = min(t_batch, t_np) if t_np == t_np else t_batch
+    print(f"  {size:>10} {t_scalar:>9.3f}s {t_batch:>9.3f}s {t_np:>9.3f}s {t_scalar/best:>7.1f}x")
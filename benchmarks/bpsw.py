@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""BPSW vs 12-base Miller-Rabin on large inputs.
+
+Usage: python3 benchmarks/bpsw.py
+Times both tests on random primes (every round runs to completion) and on
+random odd composites that survive the small-prime filter, at 128 to 2048
+bits. The strong Lucas half is reported separately.
+"""
+import random, sys, time
+from math import gcd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+
+def sample(bits, count, want_prime, rng):
+    found = []
+    while len(found) < count:
+        n = rng.getrandbits(bits) | 1 << (bits - 1) | 1
+        if gcd(n, g._SMALL_PRODUCT) == 1 and g._bpsw(n) == want_prime:
+            found.append(n)
+    return found
+
+def per_call_us(test, ns, reps):
+    start = time.perf_counter_ns()
+    for _ in range(reps):
+        for n in ns: test(n)
+    return (time.perf_counter_ns() - start) / (reps * len(ns)) / 1000
+
+mr12 = lambda n: g._miller_rabin(n, g._WITNESSES)
+rng = random.Random(10)
+print(f"  {'bits':>5} {'input':>9} {'MR x12':>11} {'BPSW':>11} {'Lucas':>11} {'speedup':>8}")
+for bits, count in ((128, 100), (512, 40), (1024, 10), (2048, 4)):
+    reps = max(1, 200 // count)
+    for kind, want in (("prime", True), ("composite", False)):
+        ns = sample(bits, count, want, rng)
+        assert all(mr12(n) == want for n in ns)
+        t_mr = per_call_us(mr12, ns, reps)
+        t_bpsw = per_call_us(g._bpsw, ns, reps)
+        t_lucas = per_call_us(g._lucas_strong, ns, reps)
+        print(f"  {bits:>5} {kind:>9} {t_mr:>9.1f}us {t_bpsw:>9.1f}us "
+              f"{t_lucas:>9.1f}us {t_mr/t_bpsw:>7.1f}x")
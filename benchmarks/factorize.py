@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""factorize() on random balanced semiprimes: trial division vs rho vs rho + SQUFOF.
+
+Usage: python3 benchmarks/factorize.py
+Each semiprime is p * q with p and q random primes of half the bit length,
+so nothing comes off in trial division and the whole cost is one split.
+Trial division (odd divisors up to sqrt n) only runs at 32 bits. SQUFOF
+only applies below 2^56, so at 64 and 96 bits both factorize() columns
+are the rho path (plus a SQUFOF-forced column at 64 bits).
+"""
+import random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import factorize as fz
+import gen11_segmented as g
+
+def trial(n):
+    d = 3
+    while d * d <= n:
+        if n % d == 0: return [d, n // d]
+        d += 2
+    return [n]
+
+def forced_squfof(n):
+    """SQUFOF past its default bound, rho only if every multiplier fails."""
+    d = fz._squfof(n) or fz._rho(n)
+    return sorted((d, n // d))
+
+def semiprimes(bits, count, rng):
+    def prime():
+        while True:
+            p = rng.getrandbits(bits // 2) | 1 << (bits // 2 - 1) | 1
+            if g.is_prime(p): return p
+    return [prime() * prime() for _ in range(count)]
+
+def per_call_ms(method, ns):
+    start = time.perf_counter()
+    for n in ns: assert len(method(n)) == 2
+    return (time.perf_counter() - start) / len(ns) * 1000
+
+methods = {"trial": trial, "rho": lambda n: fz.factorize(n, squfof=False),
+           "rho+SQUFOF": fz.factorize, "SQUFOF (forced)": forced_squfof}
+rng = random.Random(21)
+print(f"  {'bits':>5} {'count':>6} " + " ".join(f"{m:>16}" for m in methods))
+for bits, count in ((32, 200), (48, 50), (64, 20), (96, 3)):
+    ns = semiprimes(bits, count, rng)
+    cells = []
+    for name, method in methods.items():
+        if name == "trial" and bits > 32 or name == "SQUFOF (forced)" and bits > 64:
+            cells.append("—")
+        else:
+            cells.append(f"{per_call_ms(method, ns):.3f}ms")
+    print(f"  {bits:>5} {count:>6} " + " ".join(f"{c:>16}" for c in cells))
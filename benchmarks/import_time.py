@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Import-time benchmark - gen11 with the sieve rebuilt vs mapped from cache.
+
+Usage: python3 benchmarks/import_time.py [limits...]   (default 10^6 10^7 10^8)
+Each import runs in a fresh interpreter against a throwaway cache directory:
+  rebuild - GEN11_SIEVE_CACHE=off, sieve built at import (old behaviour)
+  cold    - empty cache, sieve built and written
+  warm    - cache populated, sieve mapped with mmap (median of 5)
+"""
+import os, statistics, subprocess, sys, tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROBE = ("import time; t = time.perf_counter(); import gen11_segmented; "
+         "print(time.perf_counter() - t)")
+
+def import_time(limit, cache):
+    env = dict(os.environ, GEN11_SIEVE_LIMIT=str(limit), GEN11_SIEVE_CACHE=cache)
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+limits = [int(float(a)) for a in sys.argv[1:]] or [10**6, 10**7, 10**8]
+
+print(f"  {'limit':>11} {'rebuild':>9} {'cold':>9} {'warm':>9} {'speedup':>8}")
+for limit in limits:
+    with tempfile.TemporaryDirectory() as tmp:
+        t_off = statistics.median(import_time(limit, "off") for _ in range(3))
+        t_cold = import_time(limit, tmp)
+        t_warm = statistics.median(import_time(limit, tmp) for _ in range(5))
+    print(f"  {limit:>11} {t_off*1000:>7.1f}ms {t_cold*1000:>7.1f}ms "
+          f"{t_warm*1000:>7.1f}ms {t_off/t_warm:>7.1f}x")
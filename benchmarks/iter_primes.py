@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""iter_primes benchmark - segment size vs throughput, with peak memory.
+
+Usage: python3 benchmarks/iter_primes.py [high]   (default 10^9)
+Counts the primes in [0, high] chunk by chunk for several segment sizes.
+Peak memory is traced separately over two segments past high (tracemalloc
+distorts timing). It depends on the segment size, not on the range.
+"""
+import sys, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+
+high = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**9
+g._segment_base(g.isqrt(high))  # base primes are shared, keep them out of the peak
+
+print(f"  {'segment':>9} {'time':>9} {'primes/s':>12} {'peak mem':>10} {'count':>10}")
+for segment_bytes in (1 << 15, 1 << 18, 1 << 20, 1 << 22):
+    start = time.perf_counter()
+    count = sum(len(c) for c in g.iter_primes(0, high, segment_bytes, chunks=True))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in g.iter_primes(high, high + 4 * segment_bytes, segment_bytes, chunks=True): pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {segment_bytes:>9,} {elapsed:>8.3f}s {count/elapsed:>12,.0f} "
+          f"{peak/2**20:>8.2f}MB {count:>10}")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Miller-Rabin engine benchmark - scalar _miller_rabin loop vs mr_batch.
+
+Usage: python3 benchmarks/mr_batch.py [count]   (default 10^6)
+"unique" is final_benchmark.py's unique workload (consecutive integers from
+999_900) scaled up to `count` numbers. Every survivor of the small-prime
+filter goes to Miller-Rabin directly; the sieve is bypassed on purpose.
+Both sides use gen11's tiered witness selection.
+"""
+import random, sys, time
+from math import gcd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import numpy as np
+import gen11_segmented as g
+
+count = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6
+rng = random.Random(8)
+WORKLOADS = {
+    "unique": range(999_900, 999_900 + count),
+    "uniform32": [rng.randrange(1 << 31, 1 << 32) for _ in range(count)],
+    "uniform64": [rng.randrange(1 << 63, 1 << 64) for _ in range(count // 10)],
+}
+
+print(f"  {'workload':<10} {'MR inputs':>10} {'scalar':>9} {'batch':>9} {'speedup':>8}")
+for name, numbers in WORKLOADS.items():
+    survivors = [n for n in numbers if n & 1 and gcd(n, g._SMALL_PRODUCT) == 1]
+    arr = np.array(survivors, dtype=np.uint64)
+
+    start = time.perf_counter()
+    ref = [g._miller_rabin(n) for n in survivors]
+    t_scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = g._miller_rabin_np(arr)
+    t_batch = time.perf_counter() - start
+
+    assert got.tolist() == ref, f"{name} mismatch"
+    print(f"  {name:<10} {len(survivors):>10} {t_scalar:>8.3f}s {t_batch:>8.3f}s "
+          f"{t_scalar/t_batch:>7.1f}x")
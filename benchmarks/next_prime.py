@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""next_prime / prev_prime / nth_prime vs the naive is_prime loop.
+
+Usage: python3 benchmarks/next_prime.py [count]   (default 2000 starts per scale)
+At 10^6, 10^12 and 10^18, next_prime and prev_prime from random starts are
+timed against stepping n, n+1, ... (n, n-1, ...) through gen11's uncached
+is_prime, plus 128-, 256- and 512-bit starts (fewer of them). 10^6 is inside
+the bit sieve; above it the gap window is pre-sieved and only its survivors
+get Miller-Rabin. nth_prime is timed for k = 10^4..10^9.
+"""
+import random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+from prime_count import nth_prime
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+is_prime = g.is_prime.__wrapped__
+
+def naive_next(n):
+    while not is_prime(n): n += 1
+    return n
+
+def naive_prev(n):
+    while not is_prime(n): n -= 1
+    return n
+
+def timed(f, starts):
+    start = time.perf_counter()
+    out = [f(n) for n in starts]
+    return out, (time.perf_counter() - start) / len(starts) * 1e6
+
+rng = random.Random(23)
+print(f"  {'scale':>6} {'op':>10} {'naive':>10} {'windowed':>10} {'speedup':>8}")
+scales = [(f"1e{e}", 10**e, count) for e in (6, 12, 18)]
+scales += [(f"2^{b}", 1 << b - 1, max(count >> shift, 5)) for b, shift in ((128, 2), (256, 4), (512, 7))]
+for label, low, n in scales:
+    starts = [rng.randrange(low, 2 * low) for _ in range(n)]
+    for name, fast, slow in (("next", g.next_prime, naive_next), ("prev", g.prev_prime, naive_prev)):
+        want, t_slow = timed(slow, starts)
+        got, t_fast = timed(fast, starts)
+        assert got == want
+        print(f"  {label:>6} {name + '_prime':>10} {t_slow:>8.1f}us {t_fast:>8.1f}us "
+              f"{t_slow / t_fast:>7.1f}x")
+
+print(f"\n  {'k':>6} {'nth_prime(k)':>14} {'time':>9}")
+for e in range(4, 10):
+    start = time.perf_counter()
+    p = nth_prime(10**e)
+    print(f"  {'1e' + str(e):>6} {p:>14} {time.perf_counter() - start:>8.3f}s")
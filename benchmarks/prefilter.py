@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""is_prime trial division: the old % loop vs one gcd with a primorial product.
+
+Usage: python3 benchmarks/prefilter.py [--sweep]
+Per-call latency of gen11's uncached is_prime on random 64-bit and 512-bit
+inputs (all, and primes only, where the filter runs to the end), before
+(`for p in _BASE_PRIMES[:50]: n % p`) and after (gcd against the tier
+product for n's bit length). gen6 is timed the same way on 64-bit inputs.
+--sweep re-measures the tier bounds: latency per bit length for a range of
+trial bounds, which is how gen11._TRIAL_TIERS was chosen.
+"""
+import random, sys, time
+from math import gcd, prod
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen6_sota as g6
+import gen11_segmented as g
+
+def loop_is_prime(module, primes, mr=None):
+    """The pre-gcd is_prime body above the sieve."""
+    mr = mr or module._miller_rabin
+    def is_prime(n):
+        for p in primes:
+            if n % p == 0: return n == p
+        return mr(n)
+    return is_prime
+
+def gcd_filter(n):
+    """gen11's new trial-division step alone: True if n survives it."""
+    if not n & 1: return False
+    bits = n.bit_length()
+    return gcd(n, g._SMALL_PRODUCT if bits <= 192 else g._TRIAL_BY_BITS[min(bits, g._TRIAL_TOP)]) == 1
+
+def gcd_is_prime(module, product):
+    mr = module._miller_rabin
+    def is_prime(n):
+        if gcd(n, product) != 1: return False
+        return mr(n)
+    return is_prime
+
+def per_call(f, ns, reps=3):
+    best = float("inf")
+    for _ in range(reps):
+        start = time.perf_counter()
+        for n in ns: f(n)
+        best = min(best, time.perf_counter() - start)
+    return best / len(ns) * 1e6
+
+def compare(old, new, ns, rounds=5):
+    """Best-of per-call times, before and after, taken in alternating rounds."""
+    assert [old(n) for n in ns] == [new(n) for n in ns]
+    times = [(per_call(old, ns, 1), per_call(new, ns, 1)) for _ in range(rounds)]
+    return min(t for t, _ in times), min(t for _, t in times)
+
+rng = random.Random(25)
+def inputs(bits, count, primes_only=False):
+    out = []
+    while len(out) < count:
+        n = rng.getrandbits(bits) | 1 << bits - 1
+        if not primes_only or g.is_prime(n): out.append(n)
+    return out
+
+if "--sweep" in sys.argv:
+    bounds = (229, 1000, 2048, 4096, 8192, 16384, 32768)
+    print(f"  {'bits':>5} " + " ".join(f"{'<' + str(b):>8}" for b in bounds) + "   (us per call)")
+    for bits, count in ((64, 20000), (128, 8000), (192, 5000), (256, 3000), (384, 1500),
+                        (512, 1000), (768, 400), (1024, 200), (1536, 80), (2048, 40)):
+        ns = inputs(bits, count)
+        row = [per_call(gcd_is_prime(g, prod(g._sieve_primes(b))), ns) for b in bounds]
+        print(f"  {bits:>5} " + " ".join(f"{t:>8.1f}" for t in row))
+    sys.exit()
+
+old11 = loop_is_prime(g, g._BASE_PRIMES[:50])
+new11 = g.is_prime.__wrapped__
+loop_filter = loop_is_prime(g, g._BASE_PRIMES[:50], mr=lambda n: True)
+print(f"  {'':<22} {'is_prime per call':^30}   {'trial division only':^20}")
+print(f"  {'module':<7} {'inputs':<14} {'% loop':>10} {'gcd':>10} {'speedup':>8}   {'% loop':>9} {'gcd':>9}")
+for bits, count in ((64, 20000), (512, 1000)):
+    for label, primes_only in (("random", False), ("primes", True)):
+        ns = inputs(bits, count if not primes_only else count // 10, primes_only)
+        before, after = compare(old11, new11, ns)
+        f_before, f_after = (per_call(f, ns, 5) for f in (loop_filter, gcd_filter))
+        print(f"  {'gen11':<7} {f'{bits}-bit {label}':<14} {before:>8.2f}us {after:>8.2f}us "
+              f"{before / after:>7.2f}x   {f_before:>7.2f}us {f_after:>7.2f}us")
+
+old6 = loop_is_prime(g6, g6._SMALL_PRIMES)
+new6 = g6.is_prime.__wrapped__
+before, after = compare(old6, new6, inputs(64, 20000))
+print(f"  {'gen6':<7} {'64-bit random':<14} {before:>8.2f}us {after:>8.2f}us {before / after:>7.2f}x")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""primes_in_range benchmark - gen11 odd-only wheel sieve vs the byte-loop original.
+
+Usage: python3 benchmarks/range_sieve.py
+The original per-element marking loop is reproduced here with base primes
+up to sqrt(high) (it used to stop at 1000, which is only correct to 10^6).
+"""
+import sys, time
+from math import isqrt
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+
+def loop_primes_in_range(low, high):
+    low = max(low, 2)
+    size = high - low + 1
+    is_p = bytearray(b'\x01') * size
+    for p in g._sieve_primes(isqrt(high)):
+        start = ((low + p - 1) // p) * p
+        if start < p * p: start = p * p
+        for j in range(start - low, size, p):
+            is_p[j] = 0
+    return [low + i for i in range(size) if is_p[i]]
+
+CASES = [(1_000_000, 1_100_000, 100), (10**12, 10**12 + 10**7, 1)]
+
+print(f"  {'range':<24} {'reps':>4} {'loop':>9} {'wheel':>9} {'speedup':>8} {'primes':>8}")
+for low, high, reps in CASES:
+    start = time.perf_counter()
+    for _ in range(reps): ref = loop_primes_in_range(low, high)
+    t_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(reps): got = g.primes_in_range(low, high)
+    t_wheel = time.perf_counter() - start
+
+    assert list(got) == ref, "range mismatch"
+    label = f"[{low:.0e}, +{high - low:.0e}]"
+    print(f"  {label:<24} {reps:>4} {t_loop:>8.3f}s {t_wheel:>8.3f}s "
+          f"{t_loop/t_wheel:>7.1f}x {len(got):>8}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Rank/select index over gen11's bit sieve vs linear scans.
+
+Usage: python3 benchmarks/rank_select.py [queries]   (default 2000)
+pi(n) for random n <= _SIEVE_LIMIT:
+- sieve_rank (block counts + <= 128-byte popcount)
+- a popcount over the whole prefix (the old prime_count path)
+- sum(flags[:n+1]) over a byte-per-odd-number sieve
+The k-th prime for random k:
+- sieve_select (sampled directory + bisect + in-block halving)
+- walking the byte sieve with compress/islice
+Also prints index build time and its size relative to _SIEVE.
+"""
+import random, sys, time
+from itertools import compress, count, islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+
+queries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+start = time.perf_counter()
+g._build_rank(g._SIEVE_LIMIT)
+build = time.perf_counter() - start
+start = time.perf_counter()
+rank, select = g.rank_index()
+mapped = time.perf_counter() - start
+extra = len(rank) * rank.itemsize + len(select) * select.itemsize
+print(f"  index for 1..{g._SIEVE_LIMIT:.0e}: build {build * 1000:.0f}ms, loaded {mapped * 1000:.1f}ms, "
+      f"{extra / 1024:.0f} KiB = {extra / len(g._SIEVE):.2%} of the {len(g._SIEVE) / 2**20:.1f} MiB sieve")
+
+flags = g._unpack_bits(bytes(g._SIEVE))         # 1 byte per odd number
+def popcount_prefix(n):
+    bits = (n + 1) >> 1
+    c = int.from_bytes(g._SIEVE[:bits >> 3], 'little').bit_count()
+    if bits & 7: c += (g._SIEVE[bits >> 3] & ((1 << (bits & 7)) - 1)).bit_count()
+    return c + 1
+def byte_sum(n):
+    return sum(flags[:(n + 1) >> 1]) + 1
+def byte_walk(k):
+    return 2 if k == 1 else next(islice(compress(count(1, 2), flags), k - 2, None))
+
+rng = random.Random(24)
+ns = [rng.randrange(2, g._SIEVE_LIMIT + 1) for _ in range(queries)]
+top = g.sieve_rank(g._SIEVE_LIMIT)
+ks = [rng.randrange(1, top + 1) for _ in range(queries)]
+
+def timed(f, xs, reps):
+    start = time.perf_counter()
+    out = [f(x) for x in xs[:reps]]
+    return out, (time.perf_counter() - start) / reps * 1e6
+
+print(f"  {'query':<6} {'method':<22} {'per call':>12}")
+want, t = timed(g.sieve_rank, ns, queries)
+print(f"  {'pi(n)':<6} {'sieve_rank':<22} {t:>10.2f}us")
+for name, f, reps in (("popcount prefix", popcount_prefix, queries),
+                      ("sum(flags[:n+1])", byte_sum, max(queries // 100, 5))):
+    got, t = timed(f, ns, reps)
+    assert got == want[:reps]
+    print(f"  {'':<6} {name:<22} {t:>10.2f}us")
+want, t = timed(g.sieve_select, ks, queries)
+print(f"  {'p_k':<6} {'sieve_select':<22} {t:>10.2f}us")
+got, t = timed(byte_walk, ks, max(queries // 100, 5))
+assert got == want[:len(got)]
+print(f"  {'':<6} {'compress walk':<22} {t:>10.2f}us")
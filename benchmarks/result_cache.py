@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Result cache under threads - functools.lru_cache vs prime_cache.sharded_cache.
+
+Usage: python3 benchmarks/result_cache.py [ops]   (default 200000)
+Both caches hold 16384 entries in front of gen11's uncached is_prime, with
+keys above the sieve so every miss runs Miller-Rabin. The ops are split
+over 1, 4 and 16 threads.
+  zipf  keys drawn Zipf(1.1) from 10^6 candidates
+  scan  10k ops of the same hot traffic, then a 20k-number range sweep, repeated
+"""
+import random, sys, threading, time
+from functools import lru_cache
+from itertools import count
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+from prime_cache import sharded_cache
+
+ops = int(float(sys.argv[1])) if len(sys.argv) > 1 else 200_000
+rng = random.Random(12)
+ranks = range(1, 10**6 + 1)
+weights = [r ** -1.1 for r in ranks]
+base = 10**12 + 1
+zipf = [base + 2 * r for r in rng.choices(ranks, weights, k=ops)]
+sweep = count(base + 4 * 10**6, 2)
+scan = []
+for i in range(0, ops, 10_000):
+    scan += zipf[i:i + 10_000] + [next(sweep) for _ in range(20_000)]
+scan = scan[:ops]
+
+def run(cache, keys, threads):
+    check = cache(g.is_prime.__wrapped__)
+    parts = [keys[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=lambda p: [check(n) for n in p], args=(p,))
+               for p in parts]
+    start = time.perf_counter()
+    for w in workers: w.start()
+    for w in workers: w.join()
+    elapsed = time.perf_counter() - start
+    info = check.cache_info()
+    return ops / elapsed, info.hits / (info.hits + info.misses)
+
+caches = {"lru_cache": lru_cache(maxsize=16384),
+          "sharded ARC": sharded_cache(maxsize=16384, shards=16)}
+print(f"  {'workload':<6} {'threads':>7} {'cache':<12} {'ops/s':>10} {'hit rate':>9}")
+for name, keys in (("zipf", zipf), ("scan", scan)):
+    for threads in (1, 4, 16):
+        for label, cache in caches.items():
+            rate, hits = run(cache, keys, threads)
+            print(f"  {name:<6} {threads:>7} {label:<12} {rate:>10,.0f} {hits:>8.1%}")
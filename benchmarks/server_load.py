@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Load generator for prime_server - p50/p99 latency and throughput.
+
+Usage: python3 benchmarks/server_load.py [requests] [concurrency]   (default 20000 64)
+Starts prime_server on a Unix socket once per configuration, then runs
+`concurrency` closed-loop clients spread over 8 connections. Each client
+sends single is_prime queries for IDs drawn Zipf(1.1) from 10^5 odd numbers
+above 10^12, so both coalescing and Miller-Rabin batching come into play.
+"""
+import asyncio, random, subprocess, sys, tempfile, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from prime_server import PrimeClient
+
+requests = int(float(sys.argv[1])) if len(sys.argv) > 1 else 20_000
+concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+rng = random.Random(14)
+ranks = range(1, 10**5 + 1)
+keys = [10**12 + 2 * r + 1 for r in rng.choices(ranks, [r ** -1.1 for r in ranks], k=requests)]
+
+async def load(path):
+    clients = [await PrimeClient.connect(path=path) for _ in range(8)]
+    latencies, queue = [], iter(keys)
+
+    async def user(client):
+        for n in queue:
+            start = time.perf_counter_ns()
+            await client.call("is_prime", n=n)
+            latencies.append(time.perf_counter_ns() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(clients[i % 8]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stats = await clients[0].call("stats")
+    for client in clients: await client.close()
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] / 1e6
+    return pick(0.5), pick(0.99), requests / elapsed, stats
+
+async def wait_for(path, proc):
+    while not Path(path).exists():
+        if proc.poll() is not None: raise RuntimeError("prime_server exited")
+        await asyncio.sleep(0.05)
+
+configs = {"no batching": ["--window-ms", "0", "--max-batch", "1"],
+           "batch 1ms": ["--window-ms", "1"],
+           "batch 5ms": ["--window-ms", "5"]}
+print(f"  {'server':<12} {'p50':>8} {'p99':>8} {'req/s':>9} {'coalesced':>10} {'avg batch':>10}")
+for label, flags in configs.items():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/prime.sock"
+        proc = subprocess.Popen([sys.executable, str(ROOT / "prime_server.py"), "--unix", path,
+                                 *flags], stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(wait_for(path, proc))
+            p50, p99, rate, stats = asyncio.run(load(path))
+        finally:
+            proc.terminate()
+            proc.wait()
+    batch = stats["batched"] / max(stats["batches"], 1)
+    print(f"  {label:<12} {p50:>6.2f}ms {p99:>6.2f}ms {rate:>9,.0f} "
+          f"{stats['coalesced']:>10} {batch:>10.1f}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Sieve layout benchmark - byte-per-integer vs gen11 odd-only bit sieve.
+
+Usage: python3 benchmarks/sieve.py [limits...]   (default 10^6 10^7 10^8)
+Reports build time, table size and random-lookup latency for both layouts.
+"""
+import random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+
+def build_bytes(limit):
+    s = bytearray(b'\x01') * (limit + 1)
+    s[0] = s[1] = 0
+    for i in range(2, int(limit**0.5) + 1):
+        if s[i]: s[i*i::i] = bytearray(len(s[i*i::i]))
+    return s
+
+def lookup_ns(fn, probes):
+    start = time.perf_counter_ns()
+    for n in probes: fn(n)
+    return (time.perf_counter_ns() - start) / len(probes)
+
+limits = [int(float(a)) for a in sys.argv[1:]] or [10**6, 10**7, 10**8]
+rng = random.Random(2)
+
+print(f"  {'limit':>11} {'layout':<8} {'build':>8} {'bytes':>12} {'lookup':>9}")
+for limit in limits:
+    probes = [rng.randrange(limit + 1) for _ in range(10**6)]
+
+    start = time.perf_counter()
+    byte_sieve = build_bytes(limit)
+    t_bytes = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bit_sieve = g._build_sieve(limit)
+    t_bits = time.perf_counter() - start
+
+    def byte_lookup(n, s=byte_sieve): return s[n] == 1
+    def bit_lookup(n, s=bit_sieve):
+        if n & 1: return (s[n >> 4] >> (n >> 1 & 7)) & 1 == 1
+        return n == 2
+
+    sample = probes[:10**4]
+    assert [byte_lookup(n) for n in sample] == [bit_lookup(n) for n in sample]
+    print(f"  {limit:>11} {'bytes':<8} {t_bytes:>7.3f}s {len(byte_sieve):>12,} {lookup_ns(byte_lookup, probes):>7.0f}ns")
+    print(f"  {limit:>11} {'odd-bits':<8} {t_bits:>7.3f}s {len(bit_sieve):>12,} {lookup_ns(bit_lookup, probes):>7.0f}ns")
+    del byte_sieve
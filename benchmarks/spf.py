@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Smallest-prime-factor table - build time, memory, factorizations per second.
+
+Usage: python3 benchmarks/spf.py [limit]   (default 1e7)
+Builds gen11's 16-bit odd-only SPF table from scratch, then maps it from the
+sieve cache the way a second process would. Throughput is measured on the
+top 10^5 integers below the limit, for four methods:
+- factorize_range (one pass, flat arrays)
+- factorize() per number with the table
+- factorize() per number without it (gcd-guided trial division + rho)
+- plain trial division
+"""
+import sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import factorize as fz
+import gen11_segmented as g
+from sieve_cache import load_sieve
+
+limit = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**7
+cover = g._spf_cover(limit)                              # what spf_table(limit) builds
+start = time.perf_counter()
+table = g._build_spf(cover)
+build = time.perf_counter() - start
+load_sieve(cover, "odd-spf16", lambda _: table)          # store it for the mapped run
+start = time.perf_counter()
+g.spf_table(limit)
+mapped = time.perf_counter() - start
+print(f"  SPF table to {cover:,} for {limit:.0e}: build {build:.2f}s, mapped {mapped * 1000:.1f}ms, "
+      f"{len(table) / 2**20:.1f} MiB ({len(table) * 8 / cover:.1f} bits per integer)")
+
+def trial(n):
+    out, p = [], 2
+    while p * p <= n:
+        while n % p == 0: out.append(p); n //= p
+        p += 1 if p == 2 else 2
+    return out + [n] if n > 1 else out
+
+low, high = limit - 10**5 + 1, limit
+def per_number(factor):
+    return lambda: [factor(n) for n in range(low, high + 1)]
+spf_limit = g._SPF_LIMIT
+def without_table(n):
+    g._SPF_LIMIT = 0
+    try: return fz.factorize(n)
+    finally: g._SPF_LIMIT = spf_limit
+methods = {"factorize_range": lambda: fz.factorize_range(low, high),
+           "factorize + SPF": per_number(fz.factorize),
+           "factorize, no SPF": per_number(without_table),
+           "trial division": per_number(trial)}
+print(f"  {'method':<18} {'time':>9} {'factorizations/s':>17}")
+for name, run in methods.items():
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<18} {elapsed:>8.3f}s {(high - low + 1) / elapsed:>17,.0f}")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Window bitmap cache vs lru_cache - hit rate, memory per cached answer, time.
+
+Usage: python3 benchmarks/window_cache.py
+Both caches sit in front of gen11's uncached is_prime (window_cache with the
+default 2^16-integer windows, threshold 4). Workloads:
+  unique 1e6 / 1e7   the 200-number `unique` ranges of final_benchmark.py and
+                     the generated gens, queried once each
+  unique 1e12        the same 200-number shape above the sieve (Miller-Rabin)
+  frontier           200k IDs drawn from the 5000 below a frontier at 1e12
+                     that advances by 2 per query
+Memory is traced allocation after a run divided by cached answers (lru
+entries, or integers covered by the window bitmaps).
+"""
+import random, sys, time, tracemalloc
+from functools import lru_cache
+from math import isqrt
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+from window_cache import window_cache
+
+def frontier(count, rng):
+    top = 10**12
+    for _ in range(count):
+        top += 2
+        yield top - rng.randrange(5000)
+
+rng = random.Random(13)
+workloads = {
+    "unique 1e6": list(range(999_900, 1_000_100)),
+    "unique 1e7": list(range(9_999_900, 10_000_100)),
+    "unique 1e12": list(range(10**12 - 100, 10**12 + 100)),
+    "frontier": list(frontier(200_000, rng)),
+}
+
+def run(make, keys):
+    """(seconds, hit rate) of a fresh cache, then its traced bytes per answer
+    from a second fresh pass (tracemalloc slows the sieve too much to time)."""
+    g._segment_base(isqrt(max(keys) + (1 << 16)))   # shared base primes
+    check = make(g.is_prime.__wrapped__)
+    start = time.perf_counter()
+    for n in keys: check(n)
+    elapsed = time.perf_counter() - start
+    hits = check.cache_info().hits / len(keys)
+    check = make(g.is_prime.__wrapped__)
+    tracemalloc.start()
+    for n in keys: check(n)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    window = getattr(check, "window_bytes", None)
+    answers = window() * 16 if window else check.cache_info().currsize
+    return elapsed, hits, memory / answers
+
+caches = {"lru_cache": lru_cache(maxsize=16384), "window": window_cache()}
+print(f"  {'workload':<12} {'cache':<10} {'time':>9} {'hit rate':>9} {'B/answer':>9}")
+for name, keys in workloads.items():
+    for label, make in caches.items():
+        elapsed, hits, per = run(make, keys)
+        print(f"  {name:<12} {label:<10} {elapsed*1000:>7.2f}ms {hits:>8.1%} {per:>9.2f}")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Per-tier Miller-Rabin latency - tiered witness sets vs the fixed 12 bases.
+
+Usage: python3 benchmarks/witnesses.py
+For every tier in gen11._WITNESS_TIERS, times _miller_rabin on random primes
+inside the tier (primes are the worst case: every base runs to completion).
+"""
+import random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import gen11_segmented as g
+
+def primes_between(lo, hi, count, rng):
+    found = []
+    while len(found) < count:
+        n = rng.randrange(lo, hi) | 1
+        if g._miller_rabin(n, g._WITNESSES + (41, 43, 47)): found.append(n)
+    return found
+
+def per_call_us(primes, bases):
+    start = time.perf_counter_ns()
+    for _ in range(20):
+        for n in primes: g._miller_rabin(n, bases)
+    return (time.perf_counter_ns() - start) / (20 * len(primes)) / 1000
+
+rng = random.Random(9)
+print(f"  {'tier (n <)':<26} {'bases':>5} {'fixed12':>9} {'tiered':>9} {'speedup':>8}")
+lo = 100
+for bound, bases in g._WITNESS_TIERS:
+    primes = primes_between(lo, bound, 200, rng)
+    assert all(g._miller_rabin(n) for n in primes)
+    t_fixed = per_call_us(primes, g._WITNESSES)
+    t_tier = per_call_us(primes, None)
+    count = len(bases) if bases else 2
+    print(f"  {bound:<26.4g} {count:>5} {t_fixed:>7.2f}us {t_tier:>7.2f}us {t_fixed/t_tier:>7.1f}x")
+    lo = bound
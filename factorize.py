@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Integer factorization - trial division, Brent's rho, SQUFOF. Agent Zero gen11 family.
+
+factorize(n) returns the prime factors of n in ascending order, with
+multiplicity:
+  1. powers of two come off with one bit trick; one gcd with the product
+     of gen11's _BASE_PRIMES (< 1000) tells which of them divide n, and only
+     those are divided out
+  2. every cofactor goes through gen11's uncached is_prime first, so primes
+     stop at one test, and perfect squares are split with isqrt
+  3. composites below 2^56 try SQUFOF (Shanks, with the usual small
+     multipliers), which beats rho there in pure Python; everything else,
+     and SQUFOF failures, goes to Brent's rho with x^2 + c, accumulating
+     128 |x - y| products per gcd
+Each split is O(n^(1/4)) expected: 48-bit factors take ~2^24 rho steps.
+
+Once gen11's smallest-prime-factor table is built (gen11.spf_table() or
+GEN11_SPF_LIMIT), n up to its limit is factored by walking the SPF chain
+instead, O(log n) lookups. factorize_range(low, high) factors a whole
+interval that way into two flat arrays, with no per-number lists.
+"""
+from array import array
+from math import gcd, isqrt, prod
+
+import gen11_segmented as g11
+
+_is_prime = getattr(g11.is_prime, "__wrapped__", g11.is_prime)    # keep the cache out of it
+_TRIAL = g11._BASE_PRIMES[1:]                  # odd primes < 1000
+_TRIAL_PRODUCT = prod(_TRIAL)
+_TRIAL_PRIME_BELOW = (_TRIAL[-1] + 2) ** 2     # no factor < 1000 and below this: prime
+_SQUFOF_MAX = 1 << 56                         # measured crossover with _rho
+_SQUFOF_K = (1, 3, 5, 7, 11, 3 * 5, 3 * 7, 3 * 11, 5 * 7, 5 * 11, 7 * 11,
+             3 * 5 * 7, 3 * 5 * 11, 3 * 7 * 11, 5 * 7 * 11, 3 * 5 * 7 * 11)
+_SQUARE_MOD64 = [any(i * i % 64 == r for i in range(64)) for r in range(64)]
+
+def factorize(n, squfof=True):
+    """Prime factors of n >= 1, ascending, with multiplicity."""
+    if n < 1: raise ValueError("factorize needs n >= 1")
+    if n <= g11._SPF_LIMIT: return _spf_factors(n, g11._SPF)
+    twos = (n & -n).bit_length() - 1
+    factors, n = [2] * twos, n >> twos
+    small = gcd(n, _TRIAL_PRODUCT)
+    if small > 1:
+        for p in _TRIAL:
+            if small % p: continue
+            while n % p == 0:
+                factors.append(p)
+                n //= p
+            small //= p
+            if small == 1: break
+    stack = [n] if n > 1 else []
+    while stack:
+        n = stack.pop()
+        if n < _TRIAL_PRIME_BELOW or _is_prime(n):
+            factors.append(n)
+            continue
+        r = isqrt(n)
+        if r * r == n:
+            stack += (r, r)
+            continue
+        d = squfof and n < _SQUFOF_MAX and _squfof(n) or _rho(n)
+        stack += (d, n // d)
+    factors.sort()
+    return factors
+
+def _spf_factors(n, spf):
+    twos = (n & -n).bit_length() - 1
+    factors, n = [2] * twos, n >> twos
+    while n > 1:
+        p = spf[n >> 1] or n
+        factors.append(p)
+        n //= p
+    return factors
+
+def factorize_range(low, high):
+    """Factor every n in [low, high] (low >= 1) with the SPF table, built up
+    to high if needed. Returns (offsets, factors), both array('I'): the
+    ascending factors of low + k are factors[offsets[k]:offsets[k + 1]]."""
+    if low < 1: raise ValueError("factorize_range needs low >= 1")
+    spf = g11.spf_table(high) if high > g11._SPF_LIMIT else g11._SPF
+    offsets, factors = array('I', [0]), array('I')
+    add, mark = factors.append, offsets.append
+    for n in range(low, high + 1):
+        while not n & 1:
+            add(2)
+            n >>= 1
+        while n > 1:
+            p = spf[n >> 1] or n
+            add(p)
+            n //= p
+        mark(len(factors))
+    return offsets, factors
+
+def _rho(n):
+    """A nontrivial factor of odd composite n (not a prime power)."""
+    c = 1
+    while True:
+        d = _brent(n, c)
+        if d: return d
+        c += 1
+
+def _brent(n, c, m=128):
+    """Brent's rho with f(x) = x^2 + c: a nontrivial factor of n, or None
+    when this c cycles mod every factor at once."""
+    y, r, q, g = 2, 1, 1, 1
+    while g == 1:
+        x = y
+        for _ in range(r): y = (y * y + c) % n
+        k = 0
+        while k < r and g == 1:
+            ys = y
+            for _ in range(min(m, r - k)):
+                y = (y * y + c) % n
+                q = q * abs(x - y) % n
+            g = gcd(q, n)
+            k += m
+        r <<= 1
+    if g == n:                  # the batch overshot: replay it one gcd at a time
+        while True:
+            ys = (ys * ys + c) % n
+            g = gcd(abs(x - ys), n)
+            if g > 1: break
+    return g if g != n else None
+
+def _squfof(n):
+    """Shanks' square forms factorization of odd composite non-square n:
+    a nontrivial factor, or None when no multiplier works within its bound."""
+    for k in _SQUFOF_K:
+        kn = k * n
+        p0 = p = p_prev = isqrt(kn)
+        q_prev, q = 1, kn - p0 * p0
+        if q == 0: continue
+        bound = 6 * isqrt(2 * isqrt(kn))
+        for i in range(2, bound):           # forward cycle: find a square form
+            b = (p0 + p) // q
+            p = b * q - p
+            q, q_prev = q_prev + b * (p_prev - p), q
+            if not i & 1 and _SQUARE_MOD64[q & 63]:
+                r = isqrt(q)
+                if r * r == q: break
+            p_prev = p
+        else:
+            continue
+        b = (p0 - p) // r
+        p = p_prev = b * r + p
+        q_prev, q = r, (kn - p * p) // r
+        for _ in range(bound):              # reverse cycle: find the symmetry point
+            b = (p0 + p) // q
+            p_prev, p = p, b * q - p
+            q, q_prev = q_prev + b * (p_prev - p), q
+            if p == p_prev: break
+        f = gcd(n, q_prev)
+        if 1 < f < n: return f
+    return None
+
+if __name__ == "__main__":
+    import random, time
+
+    def trial(n):
+        out, p = [], 2
+        while p * p <= n:
+            while n % p == 0: out.append(p); n //= p
+            p += 1
+        return out + [n] if n > 1 else out
+
+    assert factorize(1) == [] and factorize(2) == [2] and factorize(1 << 40) == [2] * 40
+    assert all(factorize(n) == trial(n) for n in range(1, 30_000))
+    print("✓ factorize(1..30000) matches trial division")
+
+    rng = random.Random(21)
+    def prime(bits):
+        while True:
+            p = rng.getrandbits(bits) | 1 << (bits - 1) | 1
+            if g11.is_prime(p): return p
+    cases = [1000003 ** 3, 999983 ** 2 * 1000003, 561, 41041, 3215031751, 2**64 - 1,
+             (2**31 - 1) * (2**61 - 1), 2**67 - 1, prime(40) ** 2]
+    cases += [prime(16) * prime(16) for _ in range(50)] + [prime(31) * prime(32) for _ in range(20)]
+    cases += [prime(10) * prime(20) * prime(30) * prime(8) for _ in range(20)]
+    for n in cases:
+        for use_squfof in (True, False):
+            f = factorize(n, squfof=use_squfof)
+            assert prod(f) == n and all(g11.is_prime(p) for p in f) and f == sorted(f), n
+    assert factorize(2**67 - 1) == [193707721, 761838257287]
+    print(f"✓ {len(cases)} composites up to 2^92 OK (with and without SQUFOF)")
+
+    for n in (10**18 + 9, 2**89 - 1):
+        assert factorize(n) == [n]
+    print("✓ Primes stop at one is_prime")
+
+    g11.spf_table(10**6)
+    offsets, flat = factorize_range(1, 10**6)
+    assert all(list(flat[offsets[n - 1]:offsets[n]]) == trial(n) for n in range(1, 30_000))
+    for n in rng.sample(range(30_000, 10**6), 3000):
+        assert list(flat[offsets[n - 1]:offsets[n]]) == factorize(n) == trial(n), n
+    assert factorize(10**6 + 1) == [101, 9901]            # past the table: trial + rho
+    print("✓ SPF table and factorize_range(1, 10^6) OK")
+
+    start = time.perf_counter()
+    found = factorize(prime(30) * prime(34))
+    print(f"  64-bit semiprime {found}: {(time.perf_counter() - start) * 1000:.1f}ms")
@@ -1,202 +1,268 @@
 #!/usr/bin/env python3
-"""Final honest benchmark - repeated + unique numbers"""
-import time
-from functools import lru_cache
-
-# ======= ALL GENERATIONS =======
-
-# Gen1
-def gen1(n):
-    if n < 2: return False
-    if n == 2: return True
-    if n % 2 == 0: return False
-    i = 3
-    while i * i <= n:
-        if n % i == 0: return False
-        i += 2
-    return True
-
-# Gen2
-def gen2(n):
-    if n < 2: return False
-    if n == 2 or n == 3: return True
-    if n % 2 == 0 or n % 3 == 0: return False
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0: return False
-        i += 6
-    return True
-
-# Gen3 - cached wheel
-_g3_cache = {}
-def gen3(n):
-    if n in _g3_cache: return _g3_cache[n]
-    if n < 2: r = False
-    elif n == 2 or n == 3: r = True
-    elif n % 2 == 0 or n % 3 == 0: r = False
-    else:
-        i, r = 5, True
-        while i * i <= n:
-            if n % i == 0 or n % (i+2) == 0: r = False; break
-            i += 6
-    _g3_cache[n] = r
-    return r
-
-# Gen4 - Miller-Rabin
-def gen4(n):
-    if n < 2: return False
-    for p in (2,3,5,7,11,13,17,19,23,29,31):
-        if n == p: return True
-        if n % p == 0: return False
-    r, d = 0, n-1
-    while d % 2 == 0: r += 1; d //= 2
-    for a in (2,3,5,7):
-        if a >= n: continue
-        x = pow(a, d, n)
-        if x == 1 or x == n-1: continue
-        for _ in range(r-1):
-            x = pow(x, 2, n)
-            if x == n-1: break
-        else: return False
-    return True
-
-# Gen5 - Hybrid sieve+MR
-def _sieve(lim):
-    s = [True]*(lim+1); s[0]=s[1]=False
-    for i in range(2,int(lim**.5)+1):
-        if s[i]:
-            for j in range(i*i,lim+1,i): s[j]=False
-    return s
-_S5 = _sieve(10000)
-def gen5(n):
-    if n <= 10000: return _S5[n] if n >= 0 else False
-    if n%2==0 or n%3==0 or n%5==0: return False
-    r,d = 0,n-1
-    while d%2==0: r+=1; d//=2
-    for a in (2,3,5,7):
-        if a>=n: continue
-        x=pow(a,d,n)
-        if x==1 or x==n-1: continue
-        for _ in range(r-1):
-            x=pow(x,2,n)
-            if x==n-1: break
-        else: return False
-    return True
-
-# Gen6 - SOTA
-def _sieve6(lim):
-    s = bytearray(b'\x01')*(lim+1); s[0]=s[1]=0
-    for i in range(2,int(lim**.5)+1):
-        if s[i]: s[i*i::i]=bytearray(len(s[i*i::i]))
-    return s
-_S6 = _sieve6(100000)
-_SP6 = tuple(i for i in range(2,100) if _S6[i])
-def _mr6(n):
-    r,d=0,n-1
-    while d%2==0: r+=1; d//=2
-    for a in (2,3,5,7):
-        if a>=n: continue
-        x=pow(a,d,n)
-        if x==1 or x==n-1: continue
-        for _ in range(r-1):
-            x=pow(x,2,n)
-            if x==n-1: break
-        else: return False
-    return True
-
-_g6_cache = {}
-def gen6(n):
-    if n in _g6_cache: return _g6_cache[n]
-    if n <= 100000:
-        r = bool(_S6[n]) if n >= 0 else False
+"""Full benchmark - every gen*_*.py generation, each in a fresh process.
+
+Generations are discovered from the gen*_*.py files next to this script.
+From each module the runner uses is_prime (module-level, or the is_prime
+method of a module class such as gen3's PrimeChecker) and, where present,
+primes_in_range. Every generation runs in its own interpreter, so imports,
+sieves and caches never leak between generations. Each case gets `warmup`
+untimed runs and `repeats` timed runs with perf_counter_ns, and reports the
+median, the interquartile range and operations per second. A case with a
+run (warmup or timed) past --budget seconds is reported as a timeout (trial
+division on 64-bit primes would take hours). Speedups are relative to the
+--baseline generation, Gen1 by default, as in the original README tables.
+
+Besides the fixed cases, every generation is scored on the workloads.py
+streams. They are written to --workloads DIR, or to a temporary directory,
+and every worker replays the same files. Existing files in DIR are reused,
+so a saved set can be replayed across machines and runs.
+
+    python3 final_benchmark.py                      table on stdout
+    python3 final_benchmark.py --json out.json --csv out.csv
+    python3 final_benchmark.py --readme             rewrite the README result tables
+    python3 final_benchmark.py --gens gen4 gen11 --repeats 15 --affinity 2
+    python3 final_benchmark.py --cases zipf adversarial --workloads saved/
+
+README tables sit between <!-- benchmark:CASE --> and <!-- /benchmark:CASE -->;
+<!-- benchmark:workloads --> holds ops/s for every generation on every workload.
+"""
+import argparse, csv, json, os, platform, re, signal, statistics, subprocess, sys, tempfile, time
+from importlib import import_module
+from pathlib import Path
+
+import workloads
+
+ROOT = Path(__file__).resolve().parent
+
+# name -> (kind, description, payload, loops per run, clear caches before each run)
+CASES = {
+    "repeated": ("is_prime", "same 10 numbers, 10k iterations",
+                 [2, 17, 97, 1009, 9973, 104729, 999983, 1299709, 15485863, 32452843],
+                 10_000, False),
+    "unique": ("is_prime", "200 new numbers around 1M, no cache",
+               list(range(999_900, 1_000_100)), 1, True),
+    "range": ("range", "all primes in [1M, 1.1M]", (1_000_000, 1_100_000), 1, False),
+}
+# Replayed workloads.py streams; the payload is loaded from the workload file.
+for _name, _desc in (("uniform32", "uniform below 2^32"), ("uniform64", "uniform below 2^64"),
+                     ("rsa512", "odd 512-bit RSA candidates"), ("zipf", "Zipf(1.1) repeats"),
+                     ("windows", "sliding 10^4 window"),
+                     ("adversarial", "spsp to bases 2, 3, 5, 7")):
+    CASES[_name] = ("is_prime", _desc, None, 1, True)
+
+# Strategy labels of the original hand-written benchmark; other generations
+# fall back to the first line of their docstring.
+LABELS = {1: "Trial division", 2: "Wheel factorization 6k±1", 3: "Cached wheel",
+          4: "Deterministic Miller-Rabin", 5: "Sieve + Miller-Rabin",
+          6: "Sieve + Cache + Miller-Rabin"}
+
+def discover(only=None):
+    """gen*_*.py modules in generation order, optionally filtered by name prefix."""
+    found = []
+    for path in ROOT.glob("gen*_*.py"):
+        m = re.match(r"gen(\d+)_", path.name)
+        if m and (not only or any(path.stem.startswith(o + "_") or path.stem == o for o in only)):
+            found.append((int(m.group(1)), path.stem))
+    return sorted(found)
+
+def _entry_points(module):
+    """(is_prime, primes_in_range or None, clear) for a generation module."""
+    check = getattr(module, "is_prime", None)
+    reset = None
+    if check is None:
+        cls = next(c for c in vars(module).values()
+                   if isinstance(c, type) and c.__module__ == module.__name__
+                   and hasattr(c, "is_prime"))
+        box = [cls()]
+        check = lambda n: box[0].is_prime(n)
+        reset = lambda: box.__setitem__(0, cls())
+    elif hasattr(check, "cache_clear"):
+        reset = check.cache_clear
+    return check, getattr(module, "primes_in_range", None), reset or (lambda: None)
+
+def _time_case(check, ranged, reset, case, warmup, repeats, budget):
+    kind, _, payload, loops, clear = case
+    if kind == "range":
+        if ranged is None: return None
+        low, high = payload
+        run, ops = (lambda: ranged(low, high)), 1
     else:
-        r = True
-        for p in _SP6:
-            if n % p == 0: r = (n == p); break
-        else:
-            r = _mr6(n)
-    _g6_cache[n] = r
-    return r
-
-# ======= TEST DATA =======
-repeated = [2, 17, 97, 1009, 9973, 104729, 999983, 1299709, 15485863, 32452843]
-unique = list(range(999_900, 1_000_100))  # 200 unique numbers around 1M
-
-gens = [
-    ("Gen1", gen1),
-    ("Gen2", gen2),
-    ("Gen3", gen3),
-    ("Gen4", gen4),
-    ("Gen5", gen5),
-    ("Gen6", gen6),
-]
-
-# ======= BENCHMARK =======
-ITER = 10000
-
-print("=" * 70)
-print("AGENT ZERO - FULL EVOLUTION BENCHMARK")
-print("=" * 70)
-
-# --- Repeated numbers ---
-print(f"\n📊 REPEATED (same 10 numbers x {ITER} iterations):\n")
-print(f"  {'Gen':<6} {'Time':<12} {'vs Gen1':<10} {'Strategy'}")
-print(f"  {'-'*55}")
-
-gen1_rep = None
-for name, func in gens:
-    if name == "Gen3": _g3_cache.clear()
-    if name == "Gen6": _g6_cache.clear()
-    
-    start = time.time()
-    for _ in range(ITER):
-        for n in repeated:
-            func(n)
-    t = time.time() - start
-    
-    if gen1_rep is None: gen1_rep = t
-    
-    speedup = f"{gen1_rep/t:.1f}x" if t > 0 else "inf"
-    
-    strategies = {
-        "Gen1": "Trial division",
-        "Gen2": "Wheel 6k+1",
-        "Gen3": "Cached wheel",
-        "Gen4": "Miller-Rabin",
-        "Gen5": "Sieve+MR",
-        "Gen6": "Sieve+Cache+MR"
-    }
-    
-    print(f"  {name:<6} {t:.4f}s      {speedup:<10} {strategies[name]}")
-
-# --- Unique numbers (no cache advantage) ---
-print(f"\n📊 UNIQUE (200 numbers around 1M, no cache):\n")
-print(f"  {'Gen':<6} {'Time':<12} {'vs Gen1':<10} {'Strategy'}")
-print(f"  {'-'*55}")
-
-gen1_uni = None
-for name, func in gens:
-    if name == "Gen3": _g3_cache.clear()
-    if name == "Gen6": _g6_cache.clear()
-    
-    start = time.time()
-    for n in unique:
-        func(n)
-    t = time.time() - start
-    
-    if gen1_uni is None: gen1_uni = t
-    
-    speedup = f"{gen1_uni/t:.1f}x" if t > 0 else "inf"
-    
-    print(f"  {name:<6} {t:.6f}s    {speedup:<10} {strategies[name]}")
-
-print("\n" + "=" * 70)
-print("EVOLUTION SUMMARY")
-print("=" * 70)
-print("""
-Gen1 → Gen2: Wheel factorization     → 2x brže
-Gen2 → Gen3: Added caching           → 200x brže (repeated)
-Gen3 → Gen4: Miller-Rabin algorithm  → SOTA za nove/veće brojeve
-Gen4 → Gen5: Hybrid sieve+MR         → Optimized za sve
-Gen5 → Gen6: Cache+Sieve+MR          → BEST OF ALL WORLDS
-""")
+        def run():
+            for _ in range(loops):
+                for n in payload: check(n)
+        ops = loops * len(payload)
+    samples = []
+    for i in range(warmup + repeats):
+        if clear: reset()
+        signal.setitimer(signal.ITIMER_REAL, budget)
+        start = time.perf_counter_ns()
+        try:
+            run()
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        elapsed = time.perf_counter_ns() - start
+        if i >= warmup: samples.append(elapsed)
+    return ops, samples
+
+def _on_alarm(signum, frame):
+    raise TimeoutError
+
+def _worker(stem, cases, warmup, repeats, affinity, budget, workload_dir):
+    """Child process: time one generation and print its samples as JSON."""
+    if affinity is not None: os.sched_setaffinity(0, {affinity})
+    sys.path.insert(0, str(ROOT))
+    module = import_module(stem)
+    check, ranged, reset = _entry_points(module)
+    signal.signal(signal.SIGALRM, _on_alarm)
+    out = {}
+    for name in cases:
+        case = CASES[name]
+        if case[2] is None:
+            case = case[:2] + (workloads.load(Path(workload_dir) / f"{name}.txt")[1],) + case[3:]
+        try:
+            timed = _time_case(check, ranged, reset, case, warmup, repeats, budget)
+        except TimeoutError:
+            out[name] = {"timeout": budget}
+            continue
+        if timed is not None: out[name] = {"ops": timed[0], "samples_ns": timed[1]}
+    doc = (module.__doc__ or "").strip().splitlines()
+    print(json.dumps({"doc": doc[0] if doc else "", "cases": out}))
+
+def summarize(ops, samples):
+    q1, median, q3 = statistics.quantiles(samples, n=4, method="inclusive") \
+        if len(samples) > 1 else samples * 3
+    return {"ops": ops, "runs": len(samples), "median_ns": median, "q1_ns": q1,
+            "q3_ns": q3, "iqr_ns": q3 - q1, "ops_per_sec": ops * 1e9 / median}
+
+def prepare_workloads(cases, directory, count, seed):
+    """Write the workload files the cases need into directory, keeping any
+    that already exist so saved streams are replayed unchanged."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in cases:
+        path = directory / f"{name}.txt"
+        if CASES[name][2] is None and not path.exists():
+            workloads.save(path, name, workloads.generate(name, count, seed),
+                           count=count, seed=seed)
+
+def run_all(gens, cases, warmup, repeats, affinity, budget, workload_dir):
+    results = []
+    for gen, stem in gens:
+        cmd = [sys.executable, __file__, "--worker", stem, "--cases", *cases,
+               "--warmup", str(warmup), "--repeats", str(repeats), "--budget", str(budget),
+               "--workloads", str(workload_dir)]
+        if affinity is not None: cmd += ["--affinity", str(affinity)]
+        proc = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+        if proc.returncode:
+            print(f"  {stem}: failed\n{proc.stderr.strip()}", file=sys.stderr)
+            continue
+        data = json.loads(proc.stdout.strip().splitlines()[-1])
+        label = LABELS.get(gen) or \
+            re.sub(r"^Gen(eration)? ?\d+ *[-:] *", "", data["doc"]).split(". ")[0].rstrip(".")
+        for name, timed in data["cases"].items():
+            stats = summarize(timed["ops"], timed["samples_ns"]) if "ops" in timed else \
+                {"timeout_s": timed["timeout"]}
+            results.append(dict(gen=gen, module=stem, label=label, case=name, **stats))
+    return results
+
+def _fmt_s(ns):
+    return f"{ns / 1e9:.4f}s" if ns >= 1e7 else f"{ns / 1e9:.6f}s"
+
+def table(results, case, baseline=1):
+    """Markdown table for one case, fastest generation in bold. Speedups are
+    against Gen`baseline`, or the oldest timed generation when it has no
+    time for this case (the header names which)."""
+    rows = [r for r in results if r["case"] == case]
+    timed = {r["gen"]: r["median_ns"] for r in rows if "median_ns" in r}
+    if not timed: return ""
+    if baseline not in timed: baseline = min(timed)
+    base, best = timed[baseline], min(timed.values())
+    lines = [f"| Gen | Median | IQR | ops/s | Speedup vs Gen{baseline} | Algorithm |",
+             "|-----|--------|-----|-------|---------|-----------|"]
+    for r in rows:
+        if "median_ns" not in r:
+            lines.append(f"| Gen{r['gen']} | > {r['timeout_s']:g}s | — | — | — | {r['label']} |")
+            continue
+        cells = [f"Gen{r['gen']}", _fmt_s(r["median_ns"]), _fmt_s(r["iqr_ns"]),
+                 f"{r['ops_per_sec']:,.0f}", f"{base / r['median_ns']:.1f}x", r["label"]]
+        if r["median_ns"] == best: cells = [f"**{c}**" for c in cells]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+def workload_matrix(results):
+    """One markdown table of ops/s: generations down, workloads across."""
+    names = [c for c, case in CASES.items() if case[2] is None
+             and any(r["case"] == c for r in results)]
+    if not names: return ""
+    lines = ["| Gen | " + " | ".join(names) + " |", "|-----|" + "---|" * len(names)]
+    for gen in sorted({r["gen"] for r in results}):
+        by_case = {r["case"]: r for r in results if r["gen"] == gen}
+        cells = [f"{by_case[c]['ops_per_sec']:,.0f}" if "ops_per_sec" in by_case.get(c, {})
+                 else "timeout" if c in by_case else "—" for c in names]
+        lines.append(f"| Gen{gen} | " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+def update_readme(results, baseline=1, path=ROOT / "README.md"):
+    """Replace each <!-- benchmark:CASE --> block (and <!-- benchmark:workloads -->)
+    with a fresh table."""
+    text = path.read_text()
+    for case in [*CASES, "workloads"]:
+        body = workload_matrix(results) if case == "workloads" else table(results, case, baseline)
+        if body:
+            text = re.sub(rf"(<!-- benchmark:{case} -->\n).*?(<!-- /benchmark:{case} -->)",
+                          lambda m: m.group(1) + body + "\n" + m.group(2), text, flags=re.S)
+    path.write_text(text)
+
+def write_csv(results, path):
+    fields = ["gen", "module", "case", "ops", "runs", "median_ns", "q1_ns", "q3_ns",
+              "iqr_ns", "ops_per_sec", "timeout_s"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--gens", nargs="*", help="module names or prefixes, e.g. gen4 gen11")
+    parser.add_argument("--cases", nargs="*", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--affinity", type=int, default=None, metavar="CPU",
+                        help="pin every generation's process to one CPU (Linux)")
+    parser.add_argument("--budget", type=float, default=10.0, metavar="SECONDS",
+                        help="per run; a case with a slower run reports a timeout")
+    parser.add_argument("--baseline", type=int, default=1, metavar="GEN",
+                        help="generation number the Speedup column is relative to")
+    parser.add_argument("--workloads", metavar="DIR", help="workload files to write or replay")
+    parser.add_argument("--workload-count", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH")
+    parser.add_argument("--csv", metavar="PATH")
+    parser.add_argument("--readme", action="store_true", help="regenerate README tables")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return _worker(args.worker, args.cases, args.warmup, args.repeats, args.affinity,
+                       args.budget, args.workloads)
+    with tempfile.TemporaryDirectory() as tmp:
+        workload_dir = args.workloads or tmp
+        prepare_workloads(args.cases, workload_dir, args.workload_count, args.seed)
+        results = run_all(discover(args.gens), args.cases, args.warmup, args.repeats,
+                          args.affinity, args.budget, workload_dir)
+    for case in args.cases:
+        kind, desc, *_ = CASES[case]
+        print(f"\n### {case} ({desc})\n\n{table(results, case, args.baseline) or '(no generation supports it)'}")
+    meta = dict(python=platform.python_version(), platform=platform.platform(),
+                warmup=args.warmup, repeats=args.repeats, affinity=args.affinity,
+                budget=args.budget, baseline=args.baseline, workload_count=args.workload_count, seed=args.seed,
+                timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    if args.json:
+        Path(args.json).write_text(json.dumps({"meta": meta, "results": results}, indent=1))
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.readme:
+        update_readme(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
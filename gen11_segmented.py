@@ -3,24 +3,136 @@
 New: primes_in_range(low, high) - find ALL primes in range efficiently.
 Segmented sieve O((high-low)*log(log(high))) vs checking each number individually.
 """
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
 from functools import lru_cache
+from itertools import chain, compress, islice
+from math import gcd, isqrt, prod
+from sieve_cache import load_sieve
 
-def _build_sieve(limit):
-    s = bytearray(b'\x01') * (limit + 1)
-    s[0] = s[1] = 0
-    for i in range(2, int(limit**0.5) + 1):
-        if s[i]: s[i*i::i] = bytearray(len(s[i*i::i]))
+try:
+    import numpy as _np
+    from mr_batch import miller_rabin_many
+except ImportError:
+    _np = None
+
+_BIT_TABLES = [bytes([0, 1 << k]) + bytes(254) for k in range(8)]
+_UNPACK_TABLES = [bytes((b >> k) & 1 for b in range(256)) for k in range(8)]
+
+def _pack_bits(flags):
+    """Pack 0/1 bytes into bits, LSB first. len(flags) must be a multiple of 8."""
+    acc = 0
+    for k, table in enumerate(_BIT_TABLES):
+        acc |= int.from_bytes(flags[k::8].translate(table), 'little')
+    return acc.to_bytes(len(flags) >> 3, 'little')
+
+def _unpack_bits(bits):
+    """Inverse of _pack_bits: one 0/1 byte per bit."""
+    flags = bytearray(len(bits) * 8)
+    for k, table in enumerate(_UNPACK_TABLES):
+        flags[k::8] = bits.translate(table)
+    return flags
+
+def _build_sieve(limit, segment=1 << 18):
+    """Odd-only bit sieve: bit i is set iff 2*i + 1 is prime.
+    One bit per odd number (16x smaller than a bytearray), built in
+    cache-sized segments so the byte-per-number scratch never exceeds 256 KB.
+    """
+    size = (limit + 1) // 2
+    root = isqrt(limit)
+    small = bytearray(b'\x01') * (root + 1)
+    base = []
+    for i in range(3, root + 1, 2):
+        if small[i]:
+            base.append(i)
+            small[i*i::i] = bytes(len(range(i*i, root + 1, i)))
+    s = bytearray()
+    for lo in range(0, size, segment):
+        hi = min(lo + segment, size)
+        flags = bytearray(b'\x01') * (hi - lo)
+        for p in base:
+            j = p * p >> 1
+            if j >= hi: break
+            if j < lo: j += (lo - j + p - 1) // p * p
+            flags[j - lo::p] = bytes((hi - 1 - j) // p + 1)
+        if lo == 0: flags[0] = 0
+        flags += bytes(-len(flags) % 8)
+        s += _pack_bits(flags)
     return s
 
-_SIEVE_LIMIT = 1_000_000
-_SIEVE = _build_sieve(_SIEVE_LIMIT)
-_BASE_PRIMES = [i for i in range(2, 1001) if _SIEVE[i]]
+def _sieve_has(n):
+    """Sieve lookup for 0 <= n <= _SIEVE_LIMIT."""
+    if n & 1: return (_SIEVE[n >> 4] >> (n >> 1 & 7)) & 1 == 1
+    return n == 2
+
+_SIEVE_LIMIT = int(os.environ.get("GEN11_SIEVE_LIMIT", 100_000_000))
+if _SIEVE_LIMIT < 1000:             # _BASE_PRIMES is read from the sieve
+    raise ValueError(f"GEN11_SIEVE_LIMIT must be at least 1000, got {_SIEVE_LIMIT}")
+_SIEVE = load_sieve(_SIEVE_LIMIT, "odd-bits", _build_sieve)
+_BASE_PRIMES = [i for i in range(2, 1001) if _sieve_has(i)]
+_SMALL_PRODUCT = prod(_BASE_PRIMES[:50])
 _WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
 
-def _miller_rabin(n):
+# Deterministic Miller-Rabin tiers (bound, bases): every odd composite below
+# bound fails one of the bases, and bound is the least strong pseudoprime to
+# them (checked by witnesses.py). None is the hashed tier: base 2 plus
+# _HASH_BASES[_hash32(n)], built against every spsp(2) < 2^32.
+_WITNESS_TIERS = (
+    (2_047, (2,)),
+    (1_373_653, (2, 3)),
+    (1 << 32, None),
+    (4_759_123_141, (2, 7, 61)),
+    (1_122_004_669_633, (2, 13, 23, 1662803)),
+    (2_152_302_898_747, (2, 3, 5, 7, 11)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17)),
+    (1 << 64, (2, 325, 9375, 28178, 450775, 9780504, 1795265022)),
+    (318_665_857_834_031_151_167_461, _WITNESSES),
+    (3_317_044_064_679_887_385_961_981, _WITNESSES + (41,)),
+)
+# First tier that can hold an n of each bit length.
+_TIER_BY_BITS = [next((i for i, (bound, _) in enumerate(_WITNESS_TIERS) if bound > 1 << b >> 1),
+                      len(_WITNESS_TIERS)) for b in range(_WITNESS_TIERS[-1][0].bit_length() + 1)]
+_HASH_BASES = (
+     3,  5,  3,  3,  5,  3,  3,  5,  5,  3,  3,  3,  3,  3,  5,  7,
+     3,  7,  3,  3,  3,  5,  3,  3,  3,  5,  5,  3,  3,  3,  3,  3,
+     3,  3,  5,  3,  5,  5,  3,  3,  3,  5,  3,  3,  3,  3,  3,  3,
+     5,  3,  3,  5,  3,  3,  3,  3,  3,  5,  3,  3,  5,  7,  5,  3,
+     5,  3,  3,  3,  3,  3,  3,  3,  7,  3,  3,  3,  5,  5,  7,  3,
+     3,  3,  3,  7,  5,  7,  3,  3,  3,  3,  5,  3,  3,  7,  3, 10,
+     5,  3,  3,  3,  5,  5,  3,  3,  3,  3,  3,  3,  3,  3,  3,  5,
+     3,  7,  3,  7,  5,  3,  3,  3,  5,  3,  3,  3,  3,  5,  3,  5,
+     3,  3,  5,  5,  7,  3,  3,  3,  3,  7,  5,  3,  3,  3,  3,  5,
+     3,  3,  3,  5,  3,  3,  3,  3, 10,  3,  5,  3,  3,  3,  3,  3,
+     3,  5,  5,  7,  3,  3,  3,  5,  3,  3, 17,  3,  3,  3,  7,  3,
+     3,  3, 15,  3,  3,  3,  3,  3, 11,  5,  3,  3,  5,  5,  3,  3,
+    13,  3,  3,  7,  3,  3,  3,  5,  3,  3,  5,  3,  3,  3,  3,  3,
+     5,  7,  3,  5,  3,  5,  3, 10,  5,  3, 13, 11,  5,  5,  3,  3,
+     3,  3,  3,  3,  3,  5,  3,  3,  3,  3,  3,  3,  5,  3,  3,  3,
+     3,  3,  5,  3,  5,  3,  3,  7,  3,  3, 10,  3,  3,  3,  3,  5,
+)
+
+def _hash32(n):
+    return (n * 0x9E3779B1 & 0xFFFFFFFF) >> 24
+
+def _witnesses(n):
+    """Smallest known deterministic base set for n, picked from n.bit_length().
+    Past the last tier (where _miller_rabin switches to BPSW) the last set is
+    returned for callers that still want plain Miller-Rabin."""
+    tiers = _WITNESS_TIERS
+    i = _TIER_BY_BITS[min(n.bit_length(), len(_TIER_BY_BITS) - 1)]
+    while i < len(tiers) and n >= tiers[i][0]: i += 1
+    if i == len(tiers): return tiers[-1][1]
+    bases = tiers[i][1]
+    return bases if bases is not None else (2, _HASH_BASES[_hash32(n)])
+
+def _miller_rabin(n, bases=None):
+    if bases is None and n >= _WITNESS_TIERS[-1][0]: return _bpsw(n)
     r, d = 0, n - 1
     while d % 2 == 0: r += 1; d //= 2
-    for a in _WITNESSES:
+    for a in bases or _witnesses(n):
         if a >= n: continue
         x = pow(a, d, n)
         if x == 1 or x == n - 1: continue
@@ -30,27 +142,444 @@ def _miller_rabin(n):
         else: return False
     return True
 
-@lru_cache(maxsize=16384)
+# Baillie-PSW past the deterministic tiers: strong base 2 plus a strong Lucas
+# test with Selfridge's parameters (D first of 5, -7, 9, -11, ... with
+# (D/n) = -1, P = 1, Q = (1 - D) / 4). No composite is known to pass both,
+# and the pair costs about as much as 4 Miller-Rabin rounds instead of 13.
+def _bpsw(n):
+    return _miller_rabin(n, (2,)) and _lucas_strong(n)
+
+def _jacobi(a, n):
+    """Jacobi symbol (a/n) for odd n > 0."""
+    a %= n
+    result = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5): result = -result
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3: result = -result
+        a %= n
+    return result if n == 1 else 0
+
+def _lucas_strong(n):
+    """Strong Lucas probable-prime test of odd n > 2 (Selfridge method A)."""
+    D = 5
+    while True:
+        j = _jacobi(D, n)
+        if j == -1: break
+        if j == 0 and abs(D) != n: return False
+        D = -D - 2 if D > 0 else -D + 2
+        # Squares never reach (D/n) = -1; check once the search runs long.
+        if D == -15 and isqrt(n) ** 2 == n: return False
+    Q = (1 - D) // 4
+    s, d = 0, n + 1
+    while not d & 1: s += 1; d >>= 1
+    # U_k, V_k, Q^k mod n, doubling k along the bits of d (P = 1).
+    U, V, Qk = 1, 1, Q % n
+    for bit in bin(d)[3:]:
+        U, V, Qk = U * V % n, (V * V - 2 * Qk) % n, Qk * Qk % n
+        if bit == '1':
+            U, V = U + V, D * U + V
+            if U & 1: U += n
+            if V & 1: V += n
+            U, V, Qk = (U >> 1) % n, (V >> 1) % n, Qk * Q % n
+    if U == 0 or V == 0: return True
+    for _ in range(s - 1):
+        V, Qk = (V * V - 2 * Qk) % n, Qk * Qk % n
+        if V == 0: return True
+    return False
+
+def _result_cache(maxsize):
+    """lru_cache by default. GEN11_CACHE=sharded selects prime_cache's sharded
+    scan-resistant cache (threaded servers, hot set mixed with sweeps), and
+    GEN11_CACHE=window selects window_cache's sieved bitmaps above the sieve
+    (queries clustered in numeric windows)."""
+    mode = os.environ.get("GEN11_CACHE")
+    if mode == "sharded":
+        from prime_cache import sharded_cache
+        return sharded_cache(maxsize, int(os.environ.get("GEN11_CACHE_SHARDS", 16)))
+    if mode == "window":
+        # window_cache imports gen11_segmented for its sieve; run as a script,
+        # this module is __main__ and would otherwise be loaded a second time.
+        sys.modules.setdefault("gen11_segmented", sys.modules[__name__])
+        from window_cache import window_cache
+        return window_cache(floor=_SIEVE_LIMIT)
+    return lru_cache(maxsize=maxsize)
+
+@_result_cache(16384)
 def is_prime(n):
     if n <= _SIEVE_LIMIT:
-        return bool(_SIEVE[n]) if n >= 0 else False
-    for p in _BASE_PRIMES[:50]:
-        if n % p == 0: return n == p
+        if n & 1: return n > 0 and (_SIEVE[n >> 4] >> (n >> 1 & 7)) & 1 == 1
+        return n == 2
+    if not n & 1: return False
+    bits = n.bit_length()
+    if gcd(n, _SMALL_PRODUCT if bits <= 192 else _TRIAL_BY_BITS[min(bits, _TRIAL_TOP)]) != 1:
+        return False
     return _miller_rabin(n)
 
+def is_prime_many(ns):
+    """Batch is_prime: one 0/1 flag per input, in input order.
+
+    Accepts a list, array('Q') or NumPy integer array of any shape. Returns a
+    bytearray, or a NumPy bool array of the same shape for NumPy input;
+    n < 2 (negatives included) is never prime. Sieve-range inputs are answered
+    with a bit test (one gather for NumPy input), the rest go through the
+    small-prime filter and only the survivors reach Miller-Rabin, batched
+    through mr_batch for NumPy input.
+    """
+    if _np is not None and isinstance(ns, _np.ndarray):
+        return _is_prime_many_np(ns)
+    if not ns:
+        return bytearray()
+    out = bytearray(len(ns))
+    sieve, limit, trial, top = _SIEVE, _SIEVE_LIMIT, _TRIAL_BY_BITS, _TRIAL_TOP
+    for i, n in enumerate(ns):
+        if n <= limit:
+            if n & 1:
+                if n > 0: out[i] = (sieve[n >> 4] >> (n >> 1 & 7)) & 1
+            else: out[i] = n == 2
+        elif gcd(n, trial[min(n.bit_length(), top)]) == 1:
+            out[i] = _miller_rabin(n)
+    return out
+
+def _is_prime_many_np(ns):
+    shape = ns.shape
+    ns = ns.ravel()
+    if ns.dtype.kind != 'u':            # negatives would wrap to huge uint64s
+        ns = _np.maximum(ns, 0)
+    ns = ns.astype(_np.uint64, copy=False)
+    out = _np.zeros(ns.shape, dtype=bool)
+    low = ns <= _SIEVE_LIMIT
+    n, one = ns[low], _np.uint64(1)
+    byte = _np.frombuffer(_SIEVE, dtype=_np.uint8)[n >> _np.uint64(4)]
+    bit = (byte >> ((n >> one) & _np.uint64(7)).astype(_np.uint8)) & 1
+    out[low] = (bit.astype(bool) & (n & one).astype(bool)) | (n == 2)
+    idx = _np.flatnonzero(~low)
+    big = ns[idx]
+    keep = _np.ones(big.shape, dtype=bool)
+    for p in _BASE_PRIMES[:50]:
+        keep &= big % _np.uint64(p) != 0
+    out[idx[keep]] = _miller_rabin_np(big[keep])
+    return out.reshape(shape)
+
+def _miller_rabin_np(ns):
+    """Tiered _miller_rabin over a uint64 batch of odd n > 17: base 2 plus the
+    hashed base below 2^32, then each 64-bit tier's bases on its own slice."""
+    bucket = (ns * _np.uint64(0x9E3779B1) & _np.uint64(0xFFFFFFFF)) >> _np.uint64(24)
+    hashed = _np.array(_HASH_BASES, dtype=_np.uint64)[bucket]
+    bounds = _np.array([b for b, _ in _WITNESS_TIERS if b < 1 << 64], dtype=_np.uint64)
+    tier = _np.maximum(_np.searchsorted(bounds, ns, side='right'), 2)
+    counts = _np.bincount(tier)
+    out = _np.zeros(ns.shape, dtype=bool)
+    for t in _np.flatnonzero(counts).tolist():
+        idx = slice(None) if counts[t] == len(ns) else _np.flatnonzero(tier == t)
+        bases = (2, hashed[idx]) if t == 2 else _WITNESS_TIERS[t][1]
+        out[idx] = miller_rabin_many(ns[idx], bases)
+    return out
+
+# Wheel pre-sieve: odd-only pattern with multiples of 3..13 cleared, period
+# 15015 odd numbers. Segments start as a tiled copy instead of being marked.
+_WHEEL = (3, 5, 7, 11, 13)
+_WHEEL_PERIOD = prod(_WHEEL)
+
+def _wheel_pattern():
+    s = bytearray(b'\x01') * _WHEEL_PERIOD
+    for p in _WHEEL:
+        s[p >> 1::p] = bytes(len(range(p >> 1, _WHEEL_PERIOD, p)))
+    return bytes(s) * 2
+
+_WHEEL_PATTERN = _wheel_pattern()
+
+def _sieve_primes(limit):
+    """All primes <= limit (<= _SIEVE_LIMIT), read straight from _SIEVE."""
+    flags = _unpack_bits(bytes(_SIEVE[:(limit >> 4) + 1]))
+    primes = array('Q', [2] if limit >= 2 else [])
+    primes.extend(compress(range(1, len(flags) * 2, 2), flags))
+    del primes[bisect_right(primes, limit):]
+    return primes
+
+# is_prime's trial division above the sieve: one gcd (in C) with the product
+# of the primes up to a bound chosen by n's bit length. Miller-Rabin gets
+# dearer with size, so deeper division pays off; the bounds below are the
+# measured optima (benchmarks/prefilter.py), ~8 * bits past 192 bits. The
+# first tier is _SMALL_PRODUCT, which is_prime checks without the table.
+# Every bound is below _SIEVE_LIMIT < n, so a common factor means composite.
+_TRIAL_TIERS = ((192, 229), (384, 2048), (768, 4096), (1536, 8192), (None, 16384))
+_TRIAL_TOP = _TRIAL_TIERS[-2][0] + 1
+_TRIAL_PRODUCTS = [prod(_sieve_primes(min(bound, _SIEVE_LIMIT))) for _, bound in _TRIAL_TIERS]
+# Product for each bit length up to _TRIAL_TOP (the last one covers the rest).
+_TRIAL_BY_BITS = [next(q for (top, _), q in zip(_TRIAL_TIERS, _TRIAL_PRODUCTS) if top is None or b <= top)
+                  for b in range(_TRIAL_TOP + 1)]
+
+# Rank/select index over _SIEVE, built on first use. _RANK[b] is the number
+# of set bits in the 1024-bit blocks before block b (32 bits per 1024: 3.1%
+# of the sieve, mapped from the sieve cache); _SELECT[j] is the block holding
+# set bit j * 4096 + 1, so a select bisects only the few blocks between two
+# samples. Rank is one count plus a popcount of at most 128 bytes.
+_RANK_BYTES = 128
+_SELECT_EVERY = 4096
+_RANK = _SELECT = None
+
+def _build_rank(limit):
+    counts, total = array('I', [0]), 0
+    for i in range(0, len(_SIEVE), _RANK_BYTES):
+        total += int.from_bytes(_SIEVE[i:i + _RANK_BYTES], 'little').bit_count()
+        counts.append(total)
+    return counts.tobytes()
+
+def rank_index():
+    """(_RANK, _SELECT) for the loaded sieve, built or mapped once."""
+    global _RANK, _SELECT
+    if _RANK is None:
+        rank = memoryview(load_sieve(_SIEVE_LIMIT, "odd-rank1024", _build_rank)).cast('I')
+        select = array('I', (bisect_left(rank, j + 1) - 1 for j in range(0, rank[-1], _SELECT_EVERY)))
+        select.append(len(rank) - 2)
+        _RANK, _SELECT = rank, select
+    return _RANK, _SELECT
+
+def sieve_rank(n):
+    """pi(n) for n <= _SIEVE_LIMIT in O(1)."""
+    if n < 2: return 0
+    if n > _SIEVE_LIMIT: raise ValueError("sieve_rank needs n <= _SIEVE_LIMIT")
+    rank = _RANK or rank_index()[0]
+    bits = (n + 1) >> 1                             # odd numbers 1, 3, ..., <= n
+    block, full = bits >> 10, bits >> 3
+    count = rank[block] + int.from_bytes(_SIEVE[block * _RANK_BYTES:full], 'little').bit_count()
+    if bits & 7: count += (_SIEVE[full] & ((1 << (bits & 7)) - 1)).bit_count()
+    return count + 1                                # bit 0 (the number 1) is clear; add 2
+
+def sieve_select(k):
+    """The k-th prime for 1 <= k <= pi(_SIEVE_LIMIT) in O(1)."""
+    rank, select = _RANK or rank_index()[0], _SELECT
+    if not 1 <= k <= rank[-1] + 1: raise ValueError("sieve_select needs 1 <= k <= pi(_SIEVE_LIMIT)")
+    if k == 1: return 2
+    r = k - 1                                       # r-th set bit, counting from 1
+    j = (r - 1) // _SELECT_EVERY
+    block = bisect_left(rank, r, select[j] + 1, select[j + 1] + 2) - 1
+    r -= rank[block]
+    x = int.from_bytes(_SIEVE[block * _RANK_BYTES:(block + 1) * _RANK_BYTES], 'little')
+    pos, width = block << 10, 1024
+    while width > 8:                                # halve down to the byte holding it
+        width >>= 1
+        low = (x & ((1 << width) - 1)).bit_count()
+        if r > low:
+            r -= low
+            x >>= width
+            pos += width
+    for _ in range(r - 1): x &= x - 1
+    return 2 * (pos + (x & -x).bit_length() - 1) + 1
+
+# Optional smallest-prime-factor table over odd n <= _SPF_LIMIT, built by
+# spf_table() or at import with GEN11_SPF_LIMIT. Entry i is the least prime
+# factor of 2i+1, or 0 when 2i+1 is 1 or prime. Odd composites below 2^32
+# have one below 2^16, so entries are 16-bit: 16 MB covers 2^24 > 10^7.
+_SPF, _SPF_LIMIT = None, 0
+
+def _build_spf(limit):
+    size = (limit + 1) // 2
+    spf = array('H', bytes(2 * size))
+    for p in reversed(_sieve_primes(isqrt(limit))[1:]):    # smaller primes overwrite
+        start = p * p >> 1
+        spf[start::p] = array('H', [p]) * len(range(start, size, p))
+    return spf.tobytes()
+
+def _spf_cover(limit):
+    """The limit a table for limit is actually built to: the next power of two
+    (below 2^32), so growing requests reuse a few cache files, not one each."""
+    return min(1 << (limit - 1).bit_length(), (1 << 32) - 1)
+
+def spf_table(limit=10**7):
+    """The SPF table covering at least limit (< 2^32), as a 16-bit memoryview;
+    built once, or mapped from the sieve cache like _SIEVE."""
+    global _SPF, _SPF_LIMIT
+    if not 0 < limit < 1 << 32: raise ValueError("spf_table limit must be in [1, 2^32)")
+    if limit > _SPF_LIMIT:
+        limit = _spf_cover(limit)
+        _SPF = memoryview(load_sieve(limit, "odd-spf16", _build_spf)).cast('H')
+        _SPF_LIMIT = limit
+    return _SPF
+
+def _sieve_segment(o0, size, base):
+    """Odd-only flags for o0, o0+2, ..., o0+2*(size-1); o0 odd and > 13.
+    base holds the primes > 13 up to sqrt of the segment end, ascending."""
+    k = (o0 >> 1) % _WHEEL_PERIOD
+    if size <= _WHEEL_PERIOD:
+        seg = bytearray(_WHEEL_PATTERN[k:k + size])
+    else:
+        seg = bytearray(_WHEEL_PATTERN[k:k + _WHEEL_PERIOD]) * (size // _WHEEL_PERIOD + 1)
+        del seg[size:]
+    end = o0 + 2 * size
+    for p in base:
+        m = p * p
+        if m >= end: break
+        if m < o0:
+            m = (o0 + p - 1) // p * p
+            if not m & 1: m += p
+        j = (m - o0) >> 1
+        if j < size: seg[j::p] = bytes((size - 1 - j) // p + 1)
+    return seg
+
+# Base primes > 13 for segment marking. Up to _SIEVE_LIMIT they are read from
+# _SIEVE into the shared _SEG_BASE, grown on demand (doubling, capped at the
+# sieve). Past it they are sieved per call, one segment at a time, and only
+# the caller decides what to keep.
+_SEG_BASE = array('Q')
+_SEG_BASE_TOP = 13                  # _SEG_BASE holds every prime in (13, _SEG_BASE_TOP]
+_SEGMENT_BYTES = 1 << 18
+
+def _segment_base(limit):
+    """_SEG_BASE extended to cover every prime <= min(limit, _SIEVE_LIMIT)."""
+    global _SEG_BASE_TOP
+    if limit > _SEG_BASE_TOP and _SEG_BASE_TOP < _SIEVE_LIMIT:
+        top = min(max(limit, 2 * _SEG_BASE_TOP), _SIEVE_LIMIT)
+        new = _sieve_primes(top)
+        _SEG_BASE.extend(new[bisect_right(new, _SEG_BASE_TOP):])
+        _SEG_BASE_TOP = top
+    return _SEG_BASE
+
+def _base_chunks(limit=None, extra=None):
+    """The primes > 13 up to limit (None: no end), ascending, as array('Q')
+    chunks: _SEG_BASE first (which may run past limit), then one freshly
+    sieved _SEGMENT_BYTES segment per chunk past _SIEVE_LIMIT. Those chunks
+    are sieved from a private copy of their primes <= sqrt(limit); a caller
+    that keeps every chunk anyway passes its own array as extra to have
+    them appended there and shared instead."""
+    yield _segment_base(_SIEVE_LIMIT if limit is None else limit)
+    keep = None if extra is not None or limit is None else isqrt(limit)
+    if extra is None: extra = array('Q')
+    o = _SIEVE_LIMIT + 1 | 1
+    while limit is None or o <= limit:
+        end = o + 2 * _SEGMENT_BYTES
+        seg = _sieve_segment(o, _SEGMENT_BYTES, chain(_SEG_BASE, extra) if extra else _SEG_BASE)
+        chunk = array('Q', compress(range(o, end, 2), seg))
+        if limit is not None and end > limit: chunk = chunk[:bisect_right(chunk, limit)]
+        if keep is None: extra.extend(chunk)
+        elif o <= keep: extra.extend(chunk[:bisect_right(chunk, keep)])
+        yield chunk
+        o = end
+
+def _bases(limit):
+    """An iterable of every prime > 13 up to limit, for one _sieve_segment call."""
+    return _segment_base(limit) if limit <= _SIEVE_LIMIT else chain.from_iterable(_base_chunks(limit))
+
 def primes_in_range(low, high):
-    """Segmented sieve: all primes in [low, high]."""
-    if high < 2: return []
-    low = max(low, 2)
-    size = high - low + 1
-    is_p = bytearray(b'\x01') * size
-    for p in _BASE_PRIMES:
-        if p * p > high: break
-        start = ((low + p - 1) // p) * p
-        if start < p * p: start = p * p
-        for j in range(start - low, size, p):
-            is_p[j] = 0
-    return [low + i for i in range(size) if is_p[i]]
+    """Segmented sieve: all primes in [low, high] as a compact array('Q'), or
+    a list once high reaches 2^64 (past array('Q')'s range).
+    Odd-only storage, wheel pre-sieve for 3..13, slice marking for the rest."""
+    out = array('Q') if high < 1 << 64 else []
+    if high < 2: return out
+    out.extend(p for p in (2,) + _WHEEL if low <= p <= high)
+    o0 = max(low | 1, 15)
+    if o0 > high: return out
+    root = isqrt(high)
+    if root > _SIEVE_LIMIT and high - o0 < root:
+        # Narrow window past the sieve's reach: sieving every base prime up to
+        # sqrt(high) costs far more than Miller-Rabin on what a partial
+        # pre-sieve (primes up to about the window width) leaves.
+        bound = min(_SIEVE_LIMIT, max(1 << 14, high - o0))
+        base = _segment_base(bound)
+        seg = _sieve_segment(o0, (high - o0) // 2 + 1, islice(base, bisect_right(base, bound)))
+        out.extend(c for c in compress(range(o0, high + 1, 2), seg) if _miller_rabin(c))
+        return out
+    seg = _sieve_segment(o0, (high - o0) // 2 + 1, _bases(root))
+    out.extend(compress(range(o0, high + 1, 2), seg))
+    return out
+
+def iter_primes(low=2, high=None, segment_bytes=_SEGMENT_BYTES, chunks=False):
+    """Stream the primes in [low, high] in order; high=None never stops.
+
+    Memory stays at one odd-only segment of segment_bytes (covering
+    2*segment_bytes integers) plus the base primes up to sqrt of the current
+    segment end. With chunks=True each segment is yielded as an array('Q'),
+    or as a list once it reaches 2^64.
+    """
+    head = [p for p in (2,) + _WHEEL if p >= low and (high is None or p <= high)]
+    if head:
+        if chunks: yield array('Q', head)
+        else: yield from head
+    o = max(low | 1, 15)
+    extra, more = array('Q'), None     # base primes past _SIEVE_LIMIT, freed with the generator
+    covered = _SIEVE_LIMIT
+    # A bounded range narrower than sqrt(high) past the sieve's square takes
+    # primes_in_range's pre-sieve + Miller-Rabin path segment by segment.
+    narrow = high is not None and isqrt(high) > _SIEVE_LIMIT and high - o < isqrt(high)
+    while high is None or o <= high:
+        size = segment_bytes if high is None else min(segment_bytes, (high - o) // 2 + 1)
+        end = o + 2 * size
+        root = isqrt(end - 2)
+        if narrow:
+            primes = primes_in_range(o, end - 2)
+            if chunks: yield primes
+            else: yield from primes
+            o = end
+            continue
+        if root <= _SIEVE_LIMIT:
+            base = _segment_base(root)
+        else:
+            if more is None:
+                more = _base_chunks(None if high is None else isqrt(high), extra)
+                next(more)
+            while covered < root:
+                next(more)
+                covered += 2 * _SEGMENT_BYTES
+            base = chain(_SEG_BASE, extra)
+        seg = _sieve_segment(o, size, base)
+        primes = compress(range(o, end, 2), seg)
+        if chunks: yield array('Q', primes) if end - 2 < 1 << 64 else list(primes)
+        else: yield from primes
+        o = end
+
+# next_prime / prev_prime past the sieve: pre-sieve a window of about ln n
+# odd numbers (two mean prime gaps), then Miller-Rabin the survivors in
+# order. The pre-sieve bound follows the cost of a Miller-Rabin round,
+# bits^2 / 64: primes to 64 at 64 bits, 1024 at 256, 4096 at 512 (measured;
+# deeper, the slicing costs more than the pow() calls it saves).
+def _gap_window(n):
+    """(odd numbers per window, base primes to pre-sieve it with)."""
+    bits = n.bit_length()
+    bound = min(max(64, bits * bits >> 6), 1 << 14)
+    base = _segment_base(bound)
+    return max(32, bits * 693 // 1000), base[:bisect_right(base, bound)]
+
+def next_prime(n):
+    """Smallest prime >= n."""
+    if n <= 2: return 2
+    m = n | 1
+    while m <= _SIEVE_LIMIT:
+        if (_SIEVE[m >> 4] >> (m >> 1 & 7)) & 1: return m
+        m += 2
+    size, base = _gap_window(m)
+    while True:
+        seg = _sieve_segment(m, size, base)
+        for c in compress(range(m, m + 2 * size, 2), seg):
+            if _miller_rabin(c): return c
+        m += 2 * size
+
+def prev_prime(n):
+    """Largest prime <= n; ValueError for n < 2."""
+    if n < 2: raise ValueError("no prime <= n for n < 2")
+    m = n if n & 1 else n - 1
+    if m > _SIEVE_LIMIT:
+        (size, base), floor = _gap_window(m), _SIEVE_LIMIT + 1 | 1
+        while m >= floor:
+            lo = max(m - 2 * (size - 1), floor)
+            seg = _sieve_segment(lo, (m - lo) // 2 + 1, base)
+            for c in reversed(list(compress(range(lo, m + 1, 2), seg))):
+                if _miller_rabin(c): return c
+            m = lo - 2
+    while m > 1:
+        if (_SIEVE[m >> 4] >> (m >> 1 & 7)) & 1: return m
+        m -= 2
+    return 2
+
+if os.environ.get("GEN11_SPF_LIMIT"):
+    spf_table(int(float(os.environ["GEN11_SPF_LIMIT"])))
+
+# Opt-in counters (prime_metrics); without PRIME_METRICS nothing is wrapped.
+if os.environ.get("PRIME_METRICS"):
+    import prime_metrics
+    prime_metrics.instrument(sys.modules[__name__])
 
 if __name__ == "__main__":
     import time
@@ -63,9 +592,72 @@ if __name__ == "__main__":
 
     seg = primes_in_range(10000, 10200)
     brute = [n for n in range(10000, 10201) if is_prime(n)]
-    assert seg == brute, "Segmented mismatch"
+    assert list(seg) == brute, "Segmented mismatch"
     print(f"✓ Segmented sieve OK: {len(seg)} primes in [10000,10200]")
 
+    stream = iter_primes(10000, 10200, segment_bytes=16)
+    assert list(stream) == brute, "Streaming mismatch"
+    print("✓ iter_primes OK")
+
+    # Past _SIEVE_LIMIT^2 the base primes run out of the sieve and are
+    # sieved per call; repeated and multi-segment calls must not recurse.
+    high = [n for n in range(10**16, 10**16 + 101) if n & 1 and _miller_rabin(n)]
+    assert list(primes_in_range(10**16, 10**16 + 100)) == high
+    assert list(primes_in_range(10**16, 10**16 + 100)) == high
+    stream = list(islice(iter_primes(10**16, segment_bytes=1 << 12), 300))
+    assert stream[:len(high)] == high and stream[-1] > 10**16 + (1 << 13)
+    assert all(_miller_rabin(p) for p in stream) and _SEG_BASE_TOP <= _SIEVE_LIMIT
+    lo = 2**62
+    assert list(primes_in_range(lo, lo + 3000)) == [n for n in range(lo | 1, lo + 3001, 2) if _miller_rabin(n)]
+    lo = 2**64 - 100                                # past array('Q')
+    wide = [n for n in range(lo | 1, lo + 201, 2) if _miller_rabin(n)]
+    assert list(primes_in_range(lo, lo + 200)) == wide and primes_in_range(2**64, 2**64 + 100) == [p for p in wide if p >= 2**64]
+    assert [p for c in iter_primes(lo, lo + 200, segment_bytes=32, chunks=True) for p in c] == wide
+    print("✓ Ranges above the sieve's square OK")
+
+    assert [next_prime(n) for n in (-5, 0, 2, 3, 4, 14, 10**6)] == [2, 2, 2, 3, 5, 17, 1000003]
+    assert [prev_prime(n) for n in (2, 3, 4, 16, 10**6)] == [2, 3, 3, 13, 999983]
+    for n in (_SIEVE_LIMIT - 50, 10**12, 10**18, 2**64, 2**89 - 2):
+        p, q = next_prime(n), prev_prime(n)
+        assert is_prime(p) and is_prime(q) and q <= n <= p
+        assert not any(is_prime.__wrapped__(m) for m in range(q + 1, p) if m != n)
+    assert next_prime(10**18) == 10**18 + 3 and prev_prime(10**18) == 10**18 - 11
+    print("✓ next_prime / prev_prime OK")
+
+    small = _sieve_primes(min(10**6, _SIEVE_LIMIT))
+    assert all(sieve_rank(n) == bisect_right(small, n) for n in range(0, min(10**6, _SIEVE_LIMIT), 7))
+    assert all(sieve_select(k) == p for k, p in enumerate(small, 1))
+    top = sieve_rank(_SIEVE_LIMIT)
+    assert sieve_rank(sieve_select(top)) == top and sieve_select(top) == prev_prime(_SIEVE_LIMIT)
+    print("✓ sieve_rank / sieve_select OK")
+
+    batch = [0, 1, 2, 97, 100, 999983, 999981, 15485863, 32452844, 2**61 - 1]
+    assert list(is_prime_many(batch)) == [is_prime(n) for n in batch], "Batch mismatch"
+    if _np is not None:
+        grid = _np.array(batch, dtype=_np.uint64).reshape(2, 5)
+        assert (is_prime_many(grid) == _np.array([is_prime(n) for n in batch]).reshape(2, 5)).all()
+        signed = _np.array([-(2**61 - 1), -7, -2, -1, 0, 2, 7, 2**61 - 1], dtype=_np.int64)
+        assert is_prime_many(signed).tolist() == [False] * 5 + [True] * 3
+    print("✓ is_prime_many OK")
+
+    bound = _WITNESS_TIERS[-1][0]       # spsp to every prime base <= 41
+    assert _miller_rabin(bound, _WITNESSES + (41,)) and not is_prime(bound)
+    assert is_prime(2**127 - 1) and is_prime(2**521 - 1) and not is_prime((2**89 - 1) * (2**107 - 1))
+    slpsp = (5459, 5777, 10877, 16109, 18971, 22499, 24569, 25199, 40309, 58519)
+    assert all(_lucas_strong(n) and not _bpsw(n) for n in slpsp)
+    assert all(_bpsw(n) == _sieve_has(n) for n in range(3, min(10**5, _SIEVE_LIMIT), 2))
+    print("✓ BPSW OK")
+
+    for e in (61, 127, 521, 1279, 2203):           # Mersenne primes across the gcd tiers
+        q = 2**e - 1
+        assert is_prime(q)
+        for p in (227, 2039, 4093, 8191, 16381):
+            n = q * p
+            bound = next(b for top, b in _TRIAL_TIERS if top is None or n.bit_length() <= top)
+            assert not is_prime(n)
+            assert (gcd(n, _TRIAL_BY_BITS[min(n.bit_length(), _TRIAL_TOP)]) > 1) == (p <= min(bound, _SIEVE_LIMIT))
+    print("✓ Trial-division tiers OK")
+
     cases = [2,17,97,1009,9973,104729,999983,1299709,15485863,32452843]
     is_prime.cache_clear()
     start = time.time()
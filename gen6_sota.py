@@ -11,22 +11,35 @@ Combines everything:
 This is the actual state-of-the-art for general purpose prime checking.
 """
 
+import os
+import sys
 from functools import lru_cache
+from math import gcd, isqrt, prod
+from sieve_cache import load_sieve
 
-# Sieve precompute up to 100k
+# Sieve precompute up to 100k: one bit per odd number (bit i <-> 2i+1),
+# 6.25 KB instead of 100 KB, mapped from the sieve cache after the first build
 def _build_sieve(limit):
-    sieve = bytearray(b'\x01') * (limit + 1)
-    sieve[0] = sieve[1] = 0
-    for i in range(2, int(limit**0.5) + 1):
-        if sieve[i]:
-            sieve[i*i::i] = bytearray(len(sieve[i*i::i]))
-    return sieve
+    flags = bytearray(b'\x01') * ((limit + 1) // 2)
+    flags[0] = 0
+    for i in range(3, isqrt(limit) + 1, 2):
+        if flags[i >> 1]:
+            flags[i*i >> 1::i] = bytes(len(range(i*i >> 1, len(flags), i)))
+    flags += bytes(-len(flags) % 8)
+    return bytes(sum(flags[j + k] << k for k in range(8)) for j in range(0, len(flags), 8))
 
 _SIEVE_LIMIT = 100_000
-_SIEVE = _build_sieve(_SIEVE_LIMIT)
+_SIEVE = load_sieve(_SIEVE_LIMIT, "odd-bits", _build_sieve)
+
+def _sieve_has(n):
+    """Sieve lookup for 0 <= n <= _SIEVE_LIMIT."""
+    if n & 1: return (_SIEVE[n >> 4] >> (n >> 1 & 7)) & 1 == 1
+    return n == 2
 
 # Small primes for quick divisibility
-_SMALL_PRIMES = tuple(i for i in range(2, 100) if _SIEVE[i])
+_SMALL_PRIMES = tuple(i for i in range(2, 100) if _sieve_has(i))
+_SMALL_PRODUCT = prod(_SMALL_PRIMES)
+_WITNESSES = (2, 3, 5, 7)
 
 def _miller_rabin(n):
     """Deterministic for n < 3,215,031,751"""
@@ -35,7 +48,7 @@ def _miller_rabin(n):
         r += 1
         d //= 2
     
-    for a in (2, 3, 5, 7):
+    for a in _WITNESSES:
         if a >= n:
             continue
         x = pow(a, d, n)  # Python's built-in modpow - optimized C
@@ -53,16 +66,19 @@ def _miller_rabin(n):
 def is_prime(n):
     # Sieve zone - O(1)
     if n <= _SIEVE_LIMIT:
-        return bool(_SIEVE[n]) if n >= 0 else False
+        return _sieve_has(n) if n >= 0 else False
     
-    # Quick divisibility by small primes
-    for p in _SMALL_PRIMES:
-        if n % p == 0:
-            return n == p
+    # Quick divisibility by small primes: one gcd with their product, in C
+    if not n & 1 or gcd(n, _SMALL_PRODUCT) != 1:
+        return False
     
     # Miller-Rabin for large numbers
     return _miller_rabin(n)
 
+if os.environ.get("PRIME_METRICS"):
+    import prime_metrics
+    prime_metrics.instrument(sys.modules[__name__])
+
 if __name__ == '__main__':
     import time
     
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Batched Miller-Rabin - every witness for a whole NumPy batch at once.
+
+For odd n < 2^32 every product of two residues fits in uint64, so modpow is
+plain multiply/remainder over the batch, written into preallocated buffers
+with out= so the exponent and squaring loops never allocate. For 2^32 <= n
+< 2^64 the batch works in Montgomery form (R = 2^64): the 128-bit product is
+rebuilt from four 32x32-bit partial products and reduced with a multiply by
+-1/n mod 2^64 instead of a division, again in preallocated buffers. Composites
+are compacted out after each witness, so primes pay for every base and
+composites mostly pay for one.
+
+NumPy is required; callers without it keep their scalar loop.
+"""
+import numpy as np
+
+_U32 = 1 << 32
+_ONE = np.uint64(1)
+_LO, _HALF = np.uint64(0xFFFFFFFF), np.uint64(32)
+
+def miller_rabin_many(ns, witnesses):
+    """Strong-probable-prime test of every n in ns against all witnesses.
+
+    ns: uint64 array of odd n > max(witnesses). A witness is an int shared
+    by the batch or a uint64 array aligned with ns (one base per n).
+    Returns a bool array aligned with ns.
+    """
+    ns = np.asarray(ns, dtype=np.uint64)
+    out = np.zeros(ns.shape, dtype=bool)
+    small = ns < np.uint64(_U32)
+    for mask, test in ((small, _mr32), (~small, _mr64)):
+        idx = np.flatnonzero(mask)
+        if len(idx):
+            out[idx] = test(ns[idx], [w[idx] if isinstance(w, np.ndarray) else w
+                                      for w in witnesses])
+    return out
+
+def _mr32(n, witnesses):
+    m = len(n)
+    alive = np.arange(m)
+    nm1 = n - _ONE
+    d, r = _odd_part(nm1)
+    x, bit = np.empty_like(n), np.empty_like(n)
+    ok, hit, live = (np.empty(m, dtype=bool) for _ in range(3))
+    witnesses = [w if isinstance(w, np.ndarray) else np.uint64(w) for w in witnesses]
+    for i, a in enumerate(witnesses):
+        if not len(n): break
+        _powmod(a, d, n, x, bit)
+        np.equal(x, _ONE, out=ok)
+        np.equal(x, nm1, out=hit)
+        ok |= hit
+        for j in range(1, int(r.max())):
+            if ok.all(): break
+            np.multiply(x, x, out=x)
+            np.remainder(x, n, out=x)
+            np.equal(x, nm1, out=hit)
+            np.greater(r, np.uint64(j), out=live)
+            hit &= live
+            ok |= hit
+        if not ok.all():
+            alive, n, nm1, d, r = alive[ok], n[ok], nm1[ok], d[ok], r[ok]
+            witnesses[i + 1:] = [w[ok] if w.ndim else w for w in witnesses[i + 1:]]
+            k = len(n)
+            x, bit, ok, hit, live = x[:k], bit[:k], ok[:k], hit[:k], live[:k]
+    result = np.zeros(m, dtype=bool)
+    result[alive] = True
+    return result
+
+def _powmod(a, d, n, x, bit):
+    """x = a**d % n elementwise, left to right; x and bit are scratch."""
+    x.fill(1)
+    factor = a - _ONE                    # scalar or per-element base
+    for i in range(int(d.max()).bit_length() - 1, -1, -1):
+        np.multiply(x, x, out=x)
+        np.remainder(x, n, out=x)
+        np.right_shift(d, np.uint64(i), out=bit)
+        np.bitwise_and(bit, _ONE, out=bit)
+        np.multiply(bit, factor, out=bit)
+        bit += _ONE                      # a if the bit is set, else 1
+        np.multiply(x, bit, out=x)
+        np.remainder(x, n, out=x)
+
+def _odd_part(nm1):
+    """(d, r) with nm1 == d * 2**r and d odd, elementwise."""
+    d, r = nm1.copy(), np.zeros(len(nm1), dtype=np.uint64)
+    while True:
+        even = (d & _ONE) == 0
+        if not even.any(): break
+        d[even] >>= _ONE
+        r[even] += _ONE
+    return d, r
+
+def _mr64(n, witnesses):
+    m = len(n)
+    alive = np.arange(m)
+    mont = _Montgomery(n)
+    d, r = _odd_part(n - _ONE)
+    x, a = np.empty_like(n), np.empty_like(n)
+    ok, hit, live = (np.empty(m, dtype=bool) for _ in range(3))
+    witnesses = [w if isinstance(w, np.ndarray) else np.uint64(w) for w in witnesses]
+    for i, w in enumerate(witnesses):
+        if not len(alive): break
+        a[:] = w
+        mont.mul(a, mont.r2, a)              # a*R mod n
+        mont.pow(a, d, x)
+        np.equal(x, mont.one, out=ok)
+        np.equal(x, mont.nm1, out=hit)
+        ok |= hit
+        for j in range(1, int(r.max())):
+            if ok.all(): break
+            mont.mul(x, x, x)
+            np.equal(x, mont.nm1, out=hit)
+            np.greater(r, np.uint64(j), out=live)
+            hit &= live
+            ok |= hit
+        if not ok.all():
+            alive, d, r = alive[ok], d[ok], r[ok]
+            mont.compact(ok)
+            witnesses[i + 1:] = [w[ok] if w.ndim else w for w in witnesses[i + 1:]]
+            k = len(alive)
+            x, a, ok, hit, live = x[:k], a[:k], ok[:k], hit[:k], live[:k]
+    result = np.zeros(m, dtype=bool)
+    result[alive] = True
+    return result
+
+class _Montgomery:
+    """Arithmetic mod a uint64 batch of odd n in Montgomery form, R = 2^64.
+    one and nm1 are R and -R mod n, r2 is R^2 mod n; mul() and pow() only
+    write into buffers allocated here."""
+
+    def __init__(self, n):
+        self.n = n
+        inv = n.copy()                       # n*n == 1 mod 8: three bits
+        for _ in range(5): inv *= np.uint64(2) - n * inv     # Newton: 96 bits
+        self.ninv = np.uint64(0) - inv       # -1/n mod 2^64
+        self.one = (np.uint64(0) - n) % n
+        self.nm1 = n - self.one
+        r2 = self.one.copy()
+        for _ in range(64):                  # double R mod n up to R^2 mod n
+            wrap = (r2 >> np.uint64(63)).astype(bool)
+            r2 <<= _ONE
+            wrap |= r2 >= n
+            np.subtract(r2, n, out=r2, where=wrap)
+        self.r2 = r2
+        self._buf = [np.empty_like(n) for _ in range(10)]
+        self._flag = [np.empty(n.shape, dtype=bool) for _ in range(3)]
+
+    def compact(self, keep):
+        """Drop the entries where keep is False."""
+        self.n, self.ninv = self.n[keep], self.ninv[keep]
+        self.one, self.nm1, self.r2 = self.one[keep], self.nm1[keep], self.r2[keep]
+        k = len(self.n)
+        self._buf = [b[:k] for b in self._buf]
+        self._flag = [f[:k] for f in self._flag]
+
+    def _mulhi(self, a, b, hi):
+        """hi = (a*b) >> 64 from four 32x32-bit products; hi may alias a or b."""
+        al, ah, bl, bh, t, u = self._buf[:6]
+        np.bitwise_and(a, _LO, out=al)
+        np.right_shift(a, _HALF, out=ah)
+        np.bitwise_and(b, _LO, out=bl)
+        np.right_shift(b, _HALF, out=bh)
+        np.multiply(ah, bh, out=hi)
+        np.multiply(al, bl, out=t)
+        t >>= _HALF
+        np.multiply(al, bh, out=u)
+        np.right_shift(u, _HALF, out=al)
+        hi += al
+        u &= _LO
+        t += u
+        np.multiply(ah, bl, out=u)
+        np.right_shift(u, _HALF, out=al)
+        hi += al
+        u &= _LO
+        t += u
+        t >>= _HALF
+        hi += t
+
+    def mul(self, x, y, out):
+        """out = x*y/R mod n for x, y < n; out may alias x or y."""
+        lo, hi = self._buf[6:8]
+        carry, over = self._flag[:2]
+        np.multiply(x, y, out=lo)
+        self._mulhi(x, y, hi)
+        np.not_equal(lo, 0, out=carry)       # lo + (m*n mod R) == R unless lo == 0
+        lo *= self.ninv                      # m
+        self._mulhi(lo, self.n, out)
+        out += hi
+        out += carry
+        np.less(out, hi, out=over)           # wrapped past 2^64
+        np.greater_equal(out, self.n, out=carry)
+        over |= carry
+        np.subtract(out, self.n, out=out, where=over)
+
+    def pow(self, a, d, x):
+        """x = a**d in Montgomery form, left to right; x must not alias a."""
+        t, bit = self._buf[8:10]
+        mask = self._flag[2]
+        np.copyto(x, self.one)
+        for i in range(int(d.max()).bit_length() - 1, -1, -1):
+            self.mul(x, x, x)
+            self.mul(x, a, t)
+            np.right_shift(d, np.uint64(i), out=bit)
+            bit &= _ONE
+            np.not_equal(bit, 0, out=mask)
+            np.copyto(x, t, where=mask)
+
+if __name__ == "__main__":
+    import random, time
+    import gen11_segmented as g
+
+    rng = random.Random(8)
+    cases = [n | 1 for n in (rng.randrange(41, _U32) for _ in range(20000))]
+    cases += [2047, 1373653, 25326001, 3215031751, 4294967291, 2**61 - 1, 2**64 - 59]
+    got = miller_rabin_many(np.array(cases, dtype=np.uint64), g._WITNESSES)
+    assert got.tolist() == [g._miller_rabin(n) for n in cases], "Batch MR mismatch"
+    print("✓ Batch MR OK")
+
+    wide = [rng.randrange(_U32, 1 << b) | 1 for b in range(33, 65) for _ in range(300)]
+    wide += [4759123141, 1122004669633, 3825123056546413051,    # strong pseudoprimes
+             4294967291 * 4294967279, 2**63 + 29, 2**64 - 59, 2**64 - 1]
+    got = miller_rabin_many(np.array(wide, dtype=np.uint64), g._WITNESSES)
+    assert got.tolist() == [g._miller_rabin(n, g._WITNESSES) for n in wide], "64-bit MR mismatch"
+    tiered = [n for n in wide if n % 3 and n % 5 and n % 7]
+    assert g._miller_rabin_np(np.array(tiered, dtype=np.uint64)).tolist() == \
+        [g._miller_rabin(n) for n in tiered], "Tiered 64-bit MR mismatch"
+    print("✓ Montgomery 64-bit MR OK")
+
+    ns = np.array(cases[:20000], dtype=np.uint64)
+    start = time.perf_counter()
+    for n in ns.tolist(): g._miller_rabin(n)
+    t_scalar = time.perf_counter() - start
+    start = time.perf_counter()
+    miller_rabin_many(ns, g._WITNESSES)
+    t_batch = time.perf_counter() - start
+    print(f"20k random 32-bit: scalar {t_scalar:.4f}s | batch {t_batch:.4f}s "
+          f"({t_scalar/t_batch:.1f}x)")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Parallel segmented sieve - gen11 range queries spread over a process pool.
+
+The interval is cut into tasks of task_bytes odd numbers. Each task runs on a
+ProcessPoolExecutor worker with gen11's wheel/slice segment sieve. Base primes
+up to sqrt(high) are computed once and published through shared memory, so
+workers read them in place instead of unpickling them per task. Results come
+back in interval order as counts, one array('Q'), or streamed chunks.
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from math import isqrt
+from multiprocessing import shared_memory
+
+import gen11_segmented as g11
+
+_TASK_BYTES = 1 << 22
+_BASE = None
+
+def _attach(name, count):
+    """Worker initializer: map the parent's base primes read-only."""
+    global _BASE, _SHM
+    _SHM = shared_memory.SharedMemory(name=name)
+    _BASE = _SHM.buf[:count * 8].cast('Q')
+
+def _sieve_task(o, size, collect):
+    """Sieve the odd numbers o, o+2, ..., o+2*(size-1) in cache-sized pieces."""
+    found = array('Q') if collect else 0
+    end = o + 2 * size
+    while o < end:
+        n = min(g11._SEGMENT_BYTES, (end - o) // 2)
+        seg = g11._sieve_segment(o, n, _BASE)
+        if collect: found.extend(compress(range(o, o + 2 * n, 2), seg))
+        else: found += seg.count(1)
+        o += 2 * n
+    return found
+
+def _tasks(o0, high, task_bytes):
+    o = o0
+    while o <= high:
+        size = min(task_bytes, (high - o) // 2 + 1)
+        yield o, size
+        o += 2 * size
+
+def _run(low, high, collect, workers, task_bytes):
+    """Yield (head, per-task results in order) for [low, high]."""
+    head = [p for p in (2,) + g11._WHEEL if low <= p <= high]
+    yield array('Q', head) if collect else len(head)
+    o0 = max(low | 1, 15)
+    if o0 > high: return
+    # gen11's shared base primes, plus any past its sieve (sieved here once,
+    # per call), copied chunk by chunk straight into the shared block.
+    chunks = list(g11._base_chunks(isqrt(high)))
+    count = sum(map(len, chunks))
+    workers = workers or os.cpu_count()
+    shm = shared_memory.SharedMemory(create=True, size=max(count, 1) * 8)
+    try:
+        at = 0
+        for chunk in chunks:
+            shm.buf[at:at + len(chunk) * 8] = memoryview(chunk).cast('B')
+            at += len(chunk) * 8
+        del chunks
+        with ProcessPoolExecutor(workers, initializer=_attach,
+                                 initargs=(shm.name, count)) as pool:
+            pending = []
+            for o, size in _tasks(o0, high, task_bytes):
+                pending.append(pool.submit(_sieve_task, o, size, collect))
+                if len(pending) >= 4 * workers:
+                    yield pending.pop(0).result()
+            for f in pending:
+                yield f.result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+def count_primes_in_range(low, high, workers=None, task_bytes=_TASK_BYTES):
+    """Number of primes in [low, high], sieved on `workers` processes."""
+    return sum(_run(low, high, False, workers, task_bytes))
+
+def primes_in_range(low, high, workers=None, task_bytes=_TASK_BYTES):
+    """All primes in [low, high] as one array('Q'), merged in order."""
+    out = array('Q')
+    for chunk in _run(low, high, True, workers, task_bytes):
+        out.extend(chunk)
+    return out
+
+def iter_prime_chunks(low, high, workers=None, task_bytes=_TASK_BYTES):
+    """Stream the primes in [low, high] as in-order array('Q') chunks.
+    At most 4 * workers finished chunks are held at any time."""
+    for chunk in _run(low, high, True, workers, task_bytes):
+        if chunk: yield chunk
+
+if __name__ == "__main__":
+    import time
+
+    ref = g11.primes_in_range(10**9, 10**9 + 10**6)
+    got = primes_in_range(10**9, 10**9 + 10**6, workers=2, task_bytes=1 << 16)
+    assert got == ref, "Parallel mismatch"
+    assert count_primes_in_range(0, 10**6, workers=2, task_bytes=1 << 15) == 78498
+    chunks = iter_prime_chunks(10, 10**5, workers=2, task_bytes=1 << 12)
+    assert [p for c in chunks for p in c] == list(g11.primes_in_range(10, 10**5))
+    print("✓ Parallel sieve OK")
+
+    low = 11 * 10**15                       # sqrt(high) past gen11's sieve
+    ref = g11.primes_in_range(low, low + 10**4)
+    assert primes_in_range(low, low + 10**4, workers=2, task_bytes=1 << 12) == ref
+    print("✓ Parallel sieve above 10^16 OK")
+
+    import sys
+    span = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**8
+    low, high = 10**11, 10**11 + span
+    start = time.perf_counter()
+    serial = sum(len(c) for c in g11.iter_primes(low, high, chunks=True))
+    t_serial = time.perf_counter() - start
+    print(f"gen11 serial:  {t_serial:.3f}s ({serial} primes in [1e11, 1e11+{span:.0e}])")
+    for workers in sorted({1, 2, 4, os.cpu_count()}):
+        start = time.perf_counter()
+        count = count_primes_in_range(low, high, workers)
+        t = time.perf_counter() - start
+        assert count == serial
+        print(f"parallel x{workers:<3} {t:.3f}s ({t_serial/t:.2f}x)")
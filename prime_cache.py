@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Sharded result cache - a thread-safe, scan-resistant stand-in for lru_cache.
+
+Keys are spread over a power-of-two number of shards by hash. Each shard has
+its own lock, so threads only contend when they land on the same shard, and
+runs ARC (Megiddo & Modha): keys seen once live in T1, keys hit again move
+to T2, and ghost lists of recently evicted keys (B1, B2) steer the target
+size p of T1. A one-pass sweep through is_prime only ever touches T1, so
+the hot set in T2 survives it.
+
+    @sharded_cache(maxsize=16384, shards=16)
+    def is_prime(n): ...
+
+The wrapper takes one hashable argument. It keeps lru_cache's cache_info()
+and cache_clear() and adds shard_stats() with per-shard counters.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+from functools import update_wrapper
+
+CacheInfo = namedtuple("CacheInfo", "hits misses maxsize currsize")
+ShardStats = namedtuple("ShardStats", "hits misses evictions size")
+
+_MISSING = object()
+
+class _Shard:
+    """One ARC cache of `capacity` entries (Megiddo & Modha)."""
+    __slots__ = ("lock", "capacity", "p", "t1", "t2", "b1", "b2",
+                 "hits", "misses", "evictions")
+
+    def __init__(self, capacity):
+        self.lock = threading.Lock()
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self.t1, self.t2 = OrderedDict(), OrderedDict()   # key -> value
+        self.b1, self.b2 = OrderedDict(), OrderedDict()   # ghost keys
+        self.p = self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.t1.pop(key, _MISSING)
+            if value is not _MISSING:
+                self.t2[key] = value                      # second hit: frequent
+            else:
+                value = self.t2.get(key, _MISSING)
+                if value is not _MISSING: self.t2.move_to_end(key)
+            if value is _MISSING: self.misses += 1
+            else: self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            if key in self.t1 or key in self.t2: return
+            c = self.capacity
+            if key in self.b1:                            # recency undersized
+                self.p = min(c, self.p + max(len(self.b2) // len(self.b1), 1))
+                self._replace(False)
+                del self.b1[key]
+                self.t2[key] = value
+                return
+            if key in self.b2:                            # frequency undersized
+                self.p = max(0, self.p - max(len(self.b1) // len(self.b2), 1))
+                self._replace(True)
+                del self.b2[key]
+                self.t2[key] = value
+                return
+            l1 = len(self.t1) + len(self.b1)
+            if l1 >= c:
+                if len(self.t1) < c:
+                    self.b1.popitem(last=False)
+                    self._replace(False)
+                else:
+                    self.t1.popitem(last=False)
+                    self.evictions += 1
+            elif l1 + len(self.t2) + len(self.b2) >= c:
+                if l1 + len(self.t2) + len(self.b2) >= 2 * c:
+                    self.b2.popitem(last=False)
+                self._replace(False)
+            self.t1[key] = value
+
+    def _replace(self, in_b2):
+        """Evict one resident entry into its ghost list, from T1 while T1
+        is over its target size p."""
+        if len(self.t1) + len(self.t2) < self.capacity: return
+        self.evictions += 1
+        if self.t1 and (len(self.t1) > self.p or (in_b2 and len(self.t1) == self.p)):
+            key, _ = self.t1.popitem(last=False)
+            self.b1[key] = None
+        else:
+            key, _ = self.t2.popitem(last=False)
+            self.b2[key] = None
+
+def sharded_cache(maxsize=16384, shards=16):
+    """Decorator: memoize a one-argument function in `shards` ARC shards
+    holding maxsize entries in total."""
+    if shards < 1 or shards & (shards - 1):
+        raise ValueError("shards must be a power of two")
+    if maxsize < shards:
+        raise ValueError("maxsize must be at least shards")
+
+    def decorate(func):
+        table = [_Shard(maxsize // shards) for _ in range(shards)]
+        mask = shards - 1
+
+        def wrapper(key):
+            # Fibonacci hashing: int keys of one parity still cover every shard.
+            shard = table[(hash(key) * 0x9E3779B1 >> 20) & mask]
+            value = shard.get(key)
+            if value is _MISSING:
+                value = func(key)
+                shard.put(key, value)
+            return value
+
+        def shard_stats():
+            return [ShardStats(s.hits, s.misses, s.evictions, len(s.t1) + len(s.t2))
+                    for s in table]
+
+        def cache_info():
+            stats = shard_stats()
+            return CacheInfo(sum(s.hits for s in stats), sum(s.misses for s in stats),
+                             maxsize, sum(s.size for s in stats))
+
+        def cache_clear():
+            for shard in table:
+                with shard.lock: shard.clear()
+
+        wrapper.shard_stats = shard_stats
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return update_wrapper(wrapper, func)
+    return decorate
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = []
+    @sharded_cache(maxsize=64, shards=4)
+    def square(n):
+        calls.append(n)
+        return n * n
+
+    assert [square(n) for n in (3, 4, 3)] == [9, 16, 9] and calls == [3, 4]
+    info = square.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+    print("✓ Memoization OK")
+
+    square.cache_clear()
+    hot = list(range(8))
+    for _ in range(2):                  # second hit moves the hot set to T2
+        for n in hot: square(n)
+    for n in range(10**6, 10**6 + 10_000): square(n)    # one-pass scan
+    calls.clear()
+    for n in hot: square(n)
+    assert calls == [], "scan evicted the hot set"
+    assert sum(s.evictions for s in square.shard_stats()) > 9_900
+    print("✓ Scan resistance OK")
+
+    square.cache_clear()
+    with ThreadPoolExecutor(8) as pool:
+        assert list(pool.map(square, [n % 500 for n in range(50_000)])) == \
+            [(n % 500) ** 2 for n in range(50_000)]
+    assert square.cache_info().currsize <= 64
+    print("✓ Threaded OK")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Prime counting - pi(x) via the Lucy-Hedgehog method. Agent Zero gen11 family.
+
+For x <= _SIEVE_LIMIT the answer is gen11's sieve_rank: one cumulative
+block count plus a popcount of at most 128 bytes.
+Above it, Lucy-Hedgehog keeps S(v) = #{primes <= v} for the O(sqrt x)
+distinct values v = x // k and removes each prime p <= sqrt(x) in turn:
+    S(v) -= S(v // p) - S(p - 1)    for every v >= p*p
+O(x^(3/4)) work. With NumPy each prime is a couple of vectorized
+gathers, so pi(10^12) runs in seconds. Without NumPy the same loop runs in
+pure Python (exact, but minutes at 10^12).
+
+nth_prime(k) is gen11's sieve_select while the k-th prime is inside the
+sieve. Past it, it jumps to Cipolla's estimate x of the k-th prime, counts
+pi(x) exactly, and sieves outward from x in doubling spans for the rest;
+the estimate is within ~0.02% for k >= 10^6, so the sieving is small.
+"""
+from itertools import chain
+from math import isqrt, log
+
+import gen11_segmented as g11
+
+_np = g11._np
+
+def prime_count(x):
+    """Number of primes <= x."""
+    if x < 2: return 0
+    if x <= g11._SIEVE_LIMIT: return g11.sieve_rank(x)
+    if _np is not None and x < 1 << 62: return _lucy_numpy(x)
+    return _lucy(x)
+
+def nth_prime(k):
+    """The k-th prime, k >= 1 (nth_prime(1) == 2)."""
+    if k < 1: raise ValueError("nth_prime needs k >= 1")
+    if k <= g11.sieve_rank(g11._SIEVE_LIMIT): return g11.sieve_select(k)
+    ln = log(k)
+    lnln = log(ln)
+    x = int(k * (ln + lnln - 1 + (lnln - 2) / ln))
+    have, span = prime_count(x), 1 << 14
+    if have >= k:                               # the k-th prime is <= x: walk down
+        need, hi = have - k + 1, x
+        while True:
+            lo = max(hi - span, 2)
+            primes = g11.primes_in_range(lo, hi)
+            if len(primes) >= need: return primes[-need]
+            need, hi, span = need - len(primes), lo - 1, span * 2
+    need, lo = k - have, x + 1                  # otherwise walk up
+    while True:
+        primes = g11.primes_in_range(lo, lo + span)
+        if len(primes) >= need: return primes[need - 1]
+        need, lo, span = need - len(primes), lo + span + 1, span * 2
+
+def _base_primes(r):
+    return g11._sieve_primes(r) if r <= g11._SIEVE_LIMIT else \
+        [2] + list(g11._WHEEL) + [p for p in chain.from_iterable(g11._base_chunks(r)) if p <= r]
+
+def _lucy(x):
+    r = isqrt(x)
+    small = [v - 1 for v in range(r + 1)]                      # S(v), v <= r
+    large = [0] + [x // k - 1 for k in range(1, r + 1)]        # S(x // k)
+    for p in _base_primes(r):
+        sp, p2 = small[p - 1], p * p
+        kmax = min(r, x // p2)
+        lim = min(kmax, r // p)
+        for k in range(1, lim + 1):
+            large[k] -= large[k * p] - sp
+        xp = x // p
+        for k in range(lim + 1, kmax + 1):
+            large[k] -= small[xp // k] - sp
+        for v in range(r, p2 - 1, -1):
+            small[v] -= small[v // p] - sp
+    return large[1]
+
+def _lucy_numpy(x):
+    np = _np
+    r = isqrt(x)
+    small = np.arange(-1, r, dtype=np.int64)                   # S(v) = v - 1
+    k = np.arange(1, r + 1, dtype=np.int64)
+    large = np.empty(r + 1, dtype=np.int64)
+    large[0] = 0
+    large[1:] = x // k - 1
+    for p in _base_primes(r):
+        p = int(p)
+        sp, p2 = int(small[p - 1]), p * p
+        kmax = min(r, x // p2)
+        lim = min(kmax, r // p)
+        if lim:
+            large[1:lim + 1] -= large[p:lim * p + 1:p] - sp
+        if kmax > lim:
+            large[lim + 1:kmax + 1] -= small[(x // p) // k[lim:kmax]] - sp
+        if p2 <= r:
+            small[p2:] -= small[np.arange(p2, r + 1) // p] - sp
+    return int(large[1])
+
+if __name__ == "__main__":
+    import random, sys, time
+    from bisect import bisect_right
+
+    KNOWN = {10: 4, 100: 25, 10**3: 168, 10**4: 1229, 10**6: 78498,
+             10**8: 5761455, 10**9: 50847534, 10**10: 455052511,
+             10**11: 4118054813, 10**12: 37607912018}
+    for x in (10**3, 10**6, 10**9):
+        assert prime_count(x) == _lucy(x) == KNOWN[x], f"FAIL {x}"
+    print("✓ Known values OK")
+
+    NTH = {1: 2, 6: 13, 100: 541, 10**4: 104729, 10**6: 15485863,
+           10**7: 179424673, 10**8: 2038074743}
+    assert all(nth_prime(k) == p for k, p in NTH.items())
+    assert all(prime_count(nth_prime(k)) == k and prime_count(nth_prime(k) - 1) == k - 1
+               for k in range(1, 3000))
+    print("✓ nth_prime OK")
+
+    # Cross-check Lucy (both backends) against a segmented-sieve sweep.
+    top = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**8
+    rng = random.Random(7)
+    xs = sorted(rng.randrange(2, top) for _ in range(20))
+    want, seen = {}, 0
+    pending = iter(xs)
+    x = next(pending)
+    for chunk in g11.iter_primes(0, top, chunks=True):
+        while x is not None and chunk and chunk[-1] >= x:
+            want[x] = seen + bisect_right(chunk, x)
+            x = next(pending, None)
+        seen += len(chunk)
+    while x is not None:
+        want[x] = seen
+        x = next(pending, None)
+    for x in xs:
+        got = _lucy_numpy(x) if _np is not None else _lucy(x)
+        assert got == want[x], f"FAIL {x}: {got} != {want[x]}"
+        assert x > g11._SIEVE_LIMIT or g11.sieve_rank(x) == want[x]
+    print(f"✓ Lucy vs segmented sieve OK ({len(xs)} x <= {top:.0e})")
+
+    print(f"\n  {'x':>8} {'pi(x)':>14} {'time':>9}")
+    for e in range(6, 13):
+        start = time.perf_counter()
+        count = prime_count(10**e)
+        elapsed = time.perf_counter() - start
+        assert count == KNOWN.get(10**e, count)
+        print(f"  {'1e' + str(e):>8} {count:>14} {elapsed:>8.4f}s")
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""Opt-in hot-path counters for gen6 / gen11 is_prime and _miller_rabin.
+
+instrument(module) swaps the module's is_prime and _miller_rabin for
+counting twins; uninstrument(module) puts the originals back. Nothing is
+wrapped until then, so the disabled path is the plain code with no flag
+checks. Setting PRIME_METRICS=1 instruments gen6_sota and gen11_segmented
+as they are imported. Code that did `from gen11_segmented import is_prime`
+before instrument() keeps the uncounted function. While instrumented,
+is_prime answers from a fresh cache of the same kind, whose misses are
+flagged per thread, so every hit is attributed to its own call.
+
+Per module it counts:
+    is_prime calls by path   cache, sieve, small_prime (trial-division exit),
+                             miller_rabin, bpsw
+    Miller-Rabin             tests, witness rounds, skipped bases (a >= n),
+                             squarings, and how each round ended: first
+                             (x = +-1 straight away), squaring (-1 after
+                             squaring) or composite (the test stops early)
+    latency                  a histogram of is_prime time per input
+                             bit-length class (8, 16, 32, 64, ... bits),
+                             buckets doubling from 128 ns
+
+    snapshot()          {module: counters} as plain dicts
+    prometheus()        the same in Prometheus text format
+    serve(port=9464)    a background HTTP /metrics endpoint
+"""
+import threading
+from functools import lru_cache, update_wrapper
+from time import perf_counter_ns
+
+PATHS = ("cache", "sieve", "small_prime", "miller_rabin", "bpsw")
+EXITS = ("first", "squaring", "composite")
+LATENCY_NS = tuple(1 << k for k in range(7, 26))      # 128 ns .. 33.6 ms, then +Inf
+
+_local = threading.local()          # path taken by the current is_prime call
+_REGISTRY = {}                      # module name -> Metrics
+
+def _bits_class(n):
+    bits = n.bit_length() if n > 0 else 0
+    return 8 if bits <= 8 else 1 << (bits - 1).bit_length()
+
+class Metrics:
+    """Counters for one module; one lock acquisition per call or test."""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.paths = dict.fromkeys(PATHS, 0)
+        self.mr = dict(tests=0, rounds=0, skipped=0, squarings=0)
+        self.exits = dict.fromkeys(EXITS, 0)
+        self.latency = {}           # bits class -> [count per bucket..., +Inf, sum ns]
+
+    def record_call(self, n, path, ns):
+        bucket = min(max((ns - 1).bit_length() - 7, 0), len(LATENCY_NS))
+        bits = _bits_class(n)
+        with self.lock:
+            self.paths[path] += 1
+            hist = self.latency.get(bits)
+            if hist is None: hist = self.latency[bits] = [0] * (len(LATENCY_NS) + 2)
+            hist[bucket] += 1
+            hist[-1] += ns
+
+    def record_test(self, rounds, skipped, squarings, first, squaring, composite):
+        with self.lock:
+            mr, exits = self.mr, self.exits
+            mr["tests"] += 1
+            mr["rounds"] += rounds
+            mr["skipped"] += skipped
+            mr["squarings"] += squarings
+            exits["first"] += first
+            exits["squaring"] += squaring
+            exits["composite"] += composite
+
+    def snapshot(self):
+        with self.lock:
+            latency = {}
+            for bits, hist in sorted(self.latency.items()):
+                total, buckets = 0, {}
+                for le, count in zip(LATENCY_NS + ("+Inf",), hist):
+                    total += count
+                    buckets[le] = total
+                latency[bits] = dict(buckets=buckets, count=total, sum_ns=hist[-1])
+            return dict(calls=sum(self.paths.values()), cache_hits=self.paths["cache"],
+                        paths=dict(self.paths), miller_rabin=dict(self.mr, exits=dict(self.exits)),
+                        latency=latency)
+
+def _counting_miller_rabin(metrics, module):
+    witnesses = getattr(module, "_witnesses", None)
+    fixed = getattr(module, "_WITNESSES", None)
+    bpsw_from = module._WITNESS_TIERS[-1][0] if hasattr(module, "_bpsw") else None
+
+    def _miller_rabin(n, bases=None):
+        if bases is None and bpsw_from is not None and n >= bpsw_from:
+            _local.path = "bpsw"
+            return module._bpsw(n)          # its base-2 round comes back through here
+        if getattr(_local, "path", "") is None: _local.path = "miller_rabin"
+        r, d = 0, n - 1
+        while d % 2 == 0: r += 1; d //= 2
+        rounds = skipped = squarings = first = squaring = 0
+        result = True
+        for a in bases or (witnesses(n) if witnesses else fixed):
+            if a >= n: skipped += 1; continue
+            rounds += 1
+            x = pow(a, d, n)
+            if x == 1 or x == n - 1: first += 1; continue
+            for _ in range(r - 1):
+                x = pow(x, 2, n)
+                squarings += 1
+                if x == n - 1: squaring += 1; break
+            else:
+                result = False
+                break
+        metrics.record_test(rounds, skipped, squarings, first, squaring, not result)
+        return result
+    return _miller_rabin
+
+def _counting_is_prime(metrics, module, cached):
+    """Counting is_prime around a fresh cache of the same kind (the module's
+    _result_cache, else lru_cache) over a body that flags the calling thread
+    when it runs: a call that never reaches the body was a cache hit."""
+    body, limit = getattr(cached, "__wrapped__", cached), module._SIEVE_LIMIT
+    info = getattr(cached, "cache_info", None)
+
+    def flagged(n):
+        _local.miss = True
+        return body(n)
+
+    if info is not None:
+        factory = getattr(module, "_result_cache", None) or (lambda size: lru_cache(maxsize=size))
+        cached = update_wrapper(factory(info().maxsize)(flagged), body)
+
+    def is_prime(n):
+        _local.path, _local.miss = None, info is None
+        start = perf_counter_ns()
+        result = cached(n)
+        elapsed = perf_counter_ns() - start
+        if not _local.miss: path = "cache"
+        elif n <= limit: path = "sieve"
+        else: path = _local.path or "small_prime"
+        metrics.record_call(n, path, elapsed)
+        return result
+
+    update_wrapper(is_prime, cached)
+    is_prime.__wrapped__ = body                                     # still the uncached body
+    for name in ("cache_info", "cache_clear", "shard_stats", "window_bytes"):
+        if hasattr(cached, name): setattr(is_prime, name, getattr(cached, name))
+    return is_prime
+
+def instrument(module):
+    """Swap in counting is_prime / _miller_rabin; returns the module's Metrics."""
+    metrics = _REGISTRY.get(module.__name__)
+    if metrics is not None: return metrics
+    if not (hasattr(module, "_witnesses") or hasattr(module, "_WITNESSES")):
+        raise TypeError(f"{module.__name__} has no Miller-Rabin witnesses to count")
+    metrics = _REGISTRY[module.__name__] = Metrics(module.__name__)
+    metrics.originals = module.is_prime, module._miller_rabin
+    module._miller_rabin = _counting_miller_rabin(metrics, module)
+    module.is_prime = _counting_is_prime(metrics, module, module.is_prime)
+    return metrics
+
+def uninstrument(module):
+    metrics = _REGISTRY.pop(module.__name__, None)
+    if metrics is not None: module.is_prime, module._miller_rabin = metrics.originals
+
+def snapshot():
+    return {name: metrics.snapshot() for name, metrics in _REGISTRY.items()}
+
+def reset():
+    for metrics in _REGISTRY.values():
+        with metrics.lock: metrics.clear()
+
+def _family(lines, name, kind, help, samples):
+    lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        tags = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        lines.append(f"{name}{{{tags}}} {value}")
+
+def prometheus():
+    """Every instrumented module's counters in Prometheus text format 0.0.4."""
+    snaps, lines = snapshot(), []
+    _family(lines, "prime_is_prime_calls_total", "counter", "is_prime calls by path taken.",
+            [(dict(module=m, path=p), s["paths"][p]) for m, s in snaps.items() for p in PATHS])
+    for key, help in (("tests", "Miller-Rabin tests run."),
+                      ("rounds", "Miller-Rabin witness rounds."),
+                      ("skipped", "Witnesses skipped because a >= n."),
+                      ("squarings", "Modular squarings inside witness rounds.")):
+        _family(lines, f"prime_miller_rabin_{key}_total", "counter", help,
+                [(dict(module=m), s["miller_rabin"][key]) for m, s in snaps.items()])
+    _family(lines, "prime_miller_rabin_round_exits_total", "counter",
+            "How witness rounds ended: first, squaring or composite.",
+            [(dict(module=m, exit=e), s["miller_rabin"]["exits"][e])
+             for m, s in snaps.items() for e in EXITS])
+    lines += ["# HELP prime_is_prime_latency_seconds is_prime latency by input bit-length class.",
+              "# TYPE prime_is_prime_latency_seconds histogram"]
+    for m, s in snaps.items():
+        for bits, hist in s["latency"].items():
+            tags = f'module="{m}",bits="{bits}"'
+            for le, count in hist["buckets"].items():
+                le = le if le == "+Inf" else f"{le / 1e9:g}"
+                lines.append(f'prime_is_prime_latency_seconds_bucket{{{tags},le="{le}"}} {count}')
+            lines.append(f"prime_is_prime_latency_seconds_sum{{{tags}}} {hist['sum_ns'] / 1e9:g}")
+            lines.append(f"prime_is_prime_latency_seconds_count{{{tags}}} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+def serve(port=9464, host="127.0.0.1"):
+    """Serve prometheus() at http://host:port/metrics from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics": return self.send_error(404)
+            body = prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args): pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    import random
+    from urllib.request import urlopen
+    import gen6_sota as g6, gen11_segmented as g11
+
+    plain6, plain11 = g6.is_prime, g11.is_prime
+    rng = random.Random(16)
+    numbers = ([rng.randrange(10**9) for _ in range(2000)] + [rng.getrandbits(64) for _ in range(2000)]
+               + [2**127 - 1, 2**521 - 1, 3215031751, 2**89 - 1] + list(range(100)))
+    expected = {m: [m.is_prime.__wrapped__(n) for n in numbers] for m in (g6, g11)}
+    for module in (g6, g11):
+        instrument(module)
+        module.is_prime.cache_clear()
+        assert [module.is_prime(n) for n in numbers] == expected[module], module.__name__
+        assert [module.is_prime(n) for n in numbers[:100]] == expected[module][:100]
+    snap = snapshot()
+    s11 = snap["gen11_segmented"]
+    assert s11["calls"] == len(numbers) + 100 and s11["cache_hits"] >= 100
+    assert s11["paths"]["bpsw"] >= 2 and s11["paths"]["miller_rabin"] > 0
+    assert snap["gen6_sota"]["miller_rabin"]["exits"]["composite"] > 0
+    assert sum(h["count"] for h in s11["latency"].values()) == s11["calls"]
+    print("✓ Counters OK")
+
+    server = serve(0)
+    text = urlopen(f"http://127.0.0.1:{server.server_port}/metrics").read().decode()
+    server.shutdown()
+    server.server_close()
+    assert 'prime_is_prime_calls_total{module="gen11_segmented",path="bpsw"}' in text
+    assert 'prime_is_prime_latency_seconds_bucket{module="gen6_sota",bits="64",le="+Inf"}' in text
+    print("✓ Prometheus export OK")
+
+    reset()
+    hits = g11.is_prime.cache_info().hits
+    workers = [threading.Thread(target=lambda: [g11.is_prime(n) for n in numbers]) for _ in range(4)]
+    for t in workers: t.start()
+    for t in workers: t.join()
+    assert snapshot()["gen11_segmented"]["cache_hits"] == g11.is_prime.cache_info().hits - hits
+    print("✓ Cache hits exact across threads")
+
+    for module in (g6, g11): uninstrument(module)
+    assert g6.is_prime is plain6 and g11.is_prime is plain11 and not snapshot()
+    print("✓ Uninstrument OK")
+
+    for label, s in snap.items():
+        print(f"  {label}: paths {s['paths']}")
+        print(f"  {' ' * len(label)}  miller_rabin {s['miller_rabin']}")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Prime service - gen11 over a local TCP or Unix socket with asyncio.
+
+One JSON object per line in each direction. Every request carries an "id"
+that is echoed back, so a connection can pipeline requests and answers may
+arrive out of order:
+    {"id": 1, "op": "is_prime", "n": 97}                   -> {"id": 1, "result": true}
+    {"id": 2, "op": "batch", "ns": [4, 5, 6]}              -> {"id": 2, "result": [false, true, false]}
+    {"id": 3, "op": "range", "low": 10, "high": 30}        -> {"id": 3, "result": [11, 13, ...]}
+    {"id": 4, "op": "range", "low": 0, "high": 10**9, "count": true}
+    {"id": 5, "op": "stats"}
+Failures come back as {"id": ..., "error": "..."}.
+
+Identical requests that are already in flight share one future. is_prime
+inside the sieve is answered inline (one bit test). Larger single queries
+are micro-batched: they are held for at most batch_window seconds, or until
+max_batch are waiting, then sent together as one is_prime_many call (batched
+Miller-Rabin with NumPy). Batch and range work runs on a ProcessPoolExecutor.
+Its workers map the cached sieve file rather than rebuilding it.
+
+    python3 prime_server.py [--port 8765 | --unix PATH] [--workers N]
+                            [--window-ms 2] [--max-batch 1024]
+"""
+import asyncio, json
+from concurrent.futures import ProcessPoolExecutor
+
+import gen11_segmented as g11
+
+_U64 = 1 << 64
+_LINE_LIMIT = 1 << 26                  # batch requests and range replies are long lines
+
+def _batch(ns):
+    """Worker: is_prime flags for ns, through the NumPy batch path when it fits."""
+    if g11._np is not None and ns and min(ns) >= 0 and max(ns) < _U64:
+        return g11.is_prime_many(g11._np.array(ns, dtype=g11._np.uint64)).tolist()
+    return [bool(f) for f in g11.is_prime_many(ns)]
+
+def _range(low, high, count):
+    """Worker: the primes in [low, high], or how many there are."""
+    if count: return sum(len(c) for c in g11.iter_primes(low, high, chunks=True))
+    return list(g11.primes_in_range(low, high))
+
+def _int(req, key):
+    value = req[key]
+    if type(value) is not int: raise TypeError(f"{key} must be an integer")
+    return value
+
+class PrimeServer:
+    """Request coalescing, micro-batching and a process pool behind one socket."""
+
+    def __init__(self, workers=None, batch_window=0.002, max_batch=1024, max_range=1 << 32):
+        self.pool = ProcessPoolExecutor(workers)
+        self.batch_window, self.max_batch, self.max_range = batch_window, max_batch, max_range
+        self.inflight = {}                  # request key -> task, for coalescing
+        self.pending = {}                   # n -> future waiting for the next batch
+        self.flush_timer = None
+        self.stats = dict(requests=0, coalesced=0, inline=0, batches=0, batched=0)
+
+    async def serve(self, host="127.0.0.1", port=8765, path=None):
+        if path: server = await asyncio.start_unix_server(self.handle, path, limit=_LINE_LIMIT)
+        else: server = await asyncio.start_server(self.handle, host, port, limit=_LINE_LIMIT)
+        try:
+            async with server: await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        lock, tasks = asyncio.Lock(), set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self.reply(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks: await asyncio.wait(tasks)
+        except (ConnectionError, asyncio.CancelledError):
+            pass                            # client went away, or the server is stopping
+        finally:
+            writer.close()
+
+    async def reply(self, line, writer, lock):
+        rid = None
+        try:
+            req = json.loads(line)
+            rid = req.get("id")
+            out = {"id": rid, "result": await self.dispatch(req)}
+        except Exception as e:
+            out = {"id": rid, "error": f"{type(e).__name__}: {e}"}
+        async with lock:
+            writer.write(json.dumps(out).encode() + b"\n")
+            await writer.drain()
+
+    async def dispatch(self, req):
+        self.stats["requests"] += 1
+        op = req.get("op")
+        if op == "is_prime":
+            n = _int(req, "n")
+            if n <= g11._SIEVE_LIMIT:
+                self.stats["inline"] += 1
+                return g11.is_prime(n)
+            key = (op, n)
+        elif op == "batch":
+            ns = req["ns"]
+            if not all(type(n) is int for n in ns): raise TypeError("ns must be integers")
+            key = (op, tuple(ns))
+        elif op == "range":
+            low, high = _int(req, "low"), _int(req, "high")
+            if high - low > self.max_range: raise ValueError(f"range wider than {self.max_range}")
+            key = (op, low, high, bool(req.get("count")))
+        elif op == "stats":
+            return dict(self.stats, inflight=len(self.inflight), pending=len(self.pending))
+        else:
+            raise ValueError(f"unknown op {op!r}")
+        task = self.inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self.compute(key))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def compute(self, key):
+        loop = asyncio.get_running_loop()
+        if key[0] == "is_prime":
+            fut = loop.create_future()
+            self.pending[key[1]] = fut
+            if len(self.pending) >= self.max_batch: self.flush()
+            elif self.flush_timer is None:
+                self.flush_timer = loop.call_later(self.batch_window, self.flush)
+            return await fut
+        if key[0] == "batch":
+            return await loop.run_in_executor(self.pool, _batch, list(key[1]))
+        return await loop.run_in_executor(self.pool, _range, *key[1:])
+
+    def flush(self):
+        """Send every waiting single query to the pool as one batch."""
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if not self.pending: return
+        batch, self.pending = self.pending, {}
+        self.stats["batches"] += 1
+        self.stats["batched"] += len(batch)
+        done = asyncio.get_running_loop().run_in_executor(self.pool, _batch, list(batch))
+
+        def resolve(done):
+            error = asyncio.CancelledError() if done.cancelled() else done.exception()
+            flags = [None] * len(batch) if error else done.result()
+            for fut, flag in zip(batch.values(), flags):
+                if fut.done(): continue
+                if error: fut.set_exception(error)
+                else: fut.set_result(flag)
+        done.add_done_callback(resolve)
+
+class PrimeClient:
+    """Pipelining client: concurrent calls share one connection, matched by id."""
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.waiting, self.next_id = {}, 0
+        self.listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, path=None):
+        if path: reader, writer = await asyncio.open_unix_connection(path, limit=_LINE_LIMIT)
+        else: reader, writer = await asyncio.open_connection(host, port, limit=_LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def call(self, op, **args):
+        self.next_id += 1
+        fut = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = fut
+        self.writer.write(json.dumps(dict(args, id=self.next_id, op=op)).encode() + b"\n")
+        await self.writer.drain()
+        return await fut
+
+    async def _listen(self):
+        while line := await self.reader.readline():
+            out = json.loads(line)
+            fut = self.waiting.pop(out["id"])
+            if "error" in out: fut.set_exception(RuntimeError(out["error"]))
+            else: fut.set_result(out["result"])
+        for fut in self.waiting.values():
+            fut.set_exception(ConnectionError("server closed the connection"))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.cancel()
+
+if __name__ == "__main__":
+    import argparse, signal
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--window-ms", type=float, default=2.0, help="micro-batch latency budget")
+    parser.add_argument("--max-batch", type=int, default=1024)
+    args = parser.parse_args()
+    server = PrimeServer(args.workers, args.window_ms / 1000, args.max_batch)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving gen11 on {where} (window {args.window_ms}ms, batch <= {args.max_batch})",
+          flush=True)
+
+    async def main():
+        # SIGTERM cancels serve() like Ctrl-C does, so the worker pool is shut down.
+        stop = asyncio.current_task().cancel
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop)
+        await server.serve(args.host, args.port, args.unix)
+
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Persisted sieve cache - build the sieve once, mmap it on every later import.
+
+Files are keyed by format version, layout and limit, e.g.
+~/.cache/agent-zero-primes/sieve-v1-odd-bits-100000000.bin, and start with a
+header carrying the same key plus a CRC32 of the table. Tables are opened
+read-only with mmap, so forked or concurrent workers share the same physical
+pages through the page cache. A missing, stale or corrupt file is rebuilt and
+replaced atomically (write to a temp file, then os.replace).
+
+GEN11_SIEVE_CACHE overrides the cache directory; set it to "off" to disable.
+"""
+import mmap, os, struct, zlib
+from pathlib import Path
+
+_MAGIC = b"A0SIEVE\0"
+_VERSION = 1
+_HEADER = struct.Struct("<8sI16sQQI")  # magic, version, layout, limit, size, crc32
+_HEADER_SIZE = 64
+
+def cache_dir():
+    """Directory holding cached sieves, or None when caching is disabled."""
+    env = os.environ.get("GEN11_SIEVE_CACHE")
+    if env is not None:
+        return None if env.lower() in ("", "0", "off") else Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "agent-zero-primes"
+
+def cache_path(limit, layout):
+    root = cache_dir()
+    return None if root is None else root / f"sieve-v{_VERSION}-{layout}-{limit}.bin"
+
+def load_sieve(limit, layout, build, verify=True):
+    """Return the (limit, layout) sieve as a read-only buffer.
+
+    Maps the cached file when its header (and, with verify, its checksum)
+    matches; otherwise calls build(limit), stores the result for the next
+    process and returns the mapped copy. Falls back to the freshly built
+    table when the cache directory is disabled or not writable.
+    """
+    path = cache_path(limit, layout)
+    if path is None:
+        return build(limit)
+    table = _open(path, limit, layout, verify)
+    if table is not None:
+        return table
+    data = build(limit)
+    try:
+        _write(path, limit, layout, data)
+    except OSError:
+        return data
+    return _open(path, limit, layout, verify=False) or data
+
+def _open(path, limit, layout, verify):
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mm) < _HEADER_SIZE:
+        mm.close()
+        return None
+    magic, version, tag, lim, size, crc = _HEADER.unpack_from(mm)
+    if (magic, version, tag, lim) != (_MAGIC, _VERSION, _tag(layout), limit) \
+            or len(mm) != _HEADER_SIZE + size:
+        mm.close()
+        return None
+    table = memoryview(mm)[_HEADER_SIZE:]
+    if verify and zlib.crc32(table) != crc:
+        table.release()
+        mm.close()
+        return None
+    return table
+
+def _write(path, limit, layout, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = _HEADER.pack(_MAGIC, _VERSION, _tag(layout), limit, len(data), zlib.crc32(data))
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(header.ljust(_HEADER_SIZE, b"\0"))
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists(): tmp.unlink()
+
+def _tag(layout):
+    return layout.encode().ljust(16, b"\0")[:16]
+
+if __name__ == "__main__":
+    import tempfile, time
+
+    def build(limit):
+        return bytes(range(256)) * (limit // 256)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["GEN11_SIEVE_CACHE"] = tmp
+        path = cache_path(1 << 20, "test")
+
+        start = time.perf_counter()
+        cold = load_sieve(1 << 20, "test", build)
+        t_cold = time.perf_counter() - start
+        assert isinstance(cold, memoryview) and bytes(cold) == build(1 << 20)
+
+        start = time.perf_counter()
+        warm = load_sieve(1 << 20, "test", build)
+        t_warm = time.perf_counter() - start
+        assert bytes(warm) == bytes(cold)
+        print("✓ Cache round-trip OK")
+
+        with open(path, "r+b") as f:
+            f.seek(_HEADER_SIZE + 12345)
+            f.write(b"\xff")
+        fixed = load_sieve(1 << 20, "test", build)
+        assert bytes(fixed) == build(1 << 20), "Corrupt file not rebuilt"
+        assert load_sieve(1 << 20, "other", build) is not None
+        print("✓ Checksum fallback OK")
+
+        os.environ["GEN11_SIEVE_CACHE"] = "off"
+        assert load_sieve(1 << 20, "test", build) == build(1 << 20)
+        print(f"Cold: {t_cold*1000:.2f}ms | warm: {t_warm*1000:.2f}ms")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Dense-window result cache - clustered is_prime queries answered from bitmaps.
+
+Queries that cluster in numeric windows (IDs near a moving frontier) gain
+little from lru_cache: every integer is its own ~100-byte entry and a
+neighbour's answer says nothing about the next query. window_cache counts
+misses per aligned window of `window` integers. Once a window has had
+`threshold` of them, the whole window is sieved in one go with gen11's
+wheel/slice segment sieve and kept as an odd-only bitmap (window / 16
+bytes). Later queries in it are a bit test. Windows are evicted LRU beyond
+max_windows. Misses before the threshold, and every n <= floor, go to the
+wrapped function.
+
+    @window_cache(window=1 << 16, threshold=4, max_windows=256)
+    def is_prime(n): ...
+"""
+import threading
+from collections import OrderedDict
+from functools import update_wrapper
+from math import isqrt
+
+from prime_cache import CacheInfo
+
+def window_cache(window=1 << 16, threshold=4, max_windows=256, floor=0):
+    """Decorator: answer is_prime-style calls from sieved window bitmaps."""
+    if window < 1 << 10 or window & (window - 1):
+        raise ValueError("window must be a power of two >= 1024")
+    shift = window.bit_length() - 1
+
+    def decorate(func):
+        lock = threading.Lock()
+        windows = OrderedDict()                  # window index -> bitmap
+        pending = {}                             # window index -> misses so far
+        stats = [0, 0]                           # hits, misses
+        last = [(None, None)]                    # MRU window, read without the lock
+
+        def wrapper(n):
+            w = n >> shift
+            last_w, bits = last[0]
+            if w == last_w:
+                with lock: stats[0] += 1
+            else:
+                bits = lookup(n, w)
+                if bits is None: return func(n)
+            i = (n & (window - 1)) >> 1
+            return n & 1 == 1 and (bits[i >> 3] >> (i & 7)) & 1 == 1
+
+        def lookup(n, w):
+            """Bitmap of window w, sieved on its threshold-th miss; None if not cached."""
+            if w < 1 or n <= floor:              # the sieve needs o0 > sqrt(end)
+                return None
+            with lock:
+                bits = windows.get(w)
+                if bits is not None:
+                    windows.move_to_end(w)
+                    stats[0] += 1
+                    last[0] = (w, bits)
+                    return bits
+                stats[1] += 1
+                seen = pending.get(w, 0) + 1
+                if seen < threshold:
+                    pending[w] = seen
+                    if len(pending) > 4 * max_windows:
+                        del pending[next(iter(pending))]
+                    return None
+            bits = _sieve_window(w << shift, window)
+            with lock:
+                pending.pop(w, None)
+                windows[w] = bits
+                if len(windows) > max_windows: windows.popitem(last=False)
+                last[0] = (w, bits)
+            return bits
+
+        def cache_info():
+            with lock:
+                return CacheInfo(stats[0], stats[1], max_windows, len(windows))
+
+        def cache_clear():
+            with lock:
+                windows.clear()
+                pending.clear()
+                stats[:] = [0, 0]
+                last[0] = (None, None)
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        wrapper.window_bytes = lambda: len(windows) * (window >> 4)
+        return update_wrapper(wrapper, func)
+    return decorate
+
+def _sieve_window(lo, size):
+    """Odd-only bitmap of [lo, lo + size): bit i is set iff lo + 2*i + 1 is prime."""
+    # Imported here: gen11 itself may be building its is_prime with this cache.
+    import gen11_segmented as g11
+    base = g11._bases(isqrt(lo + size))
+    return g11._pack_bits(g11._sieve_segment(lo + 1, size >> 1, base))
+
+if __name__ == "__main__":
+    import gen11_segmented as g11
+
+    calls = []
+    def plain(n):
+        calls.append(n)
+        return g11.is_prime.__wrapped__(n)
+
+    cached = window_cache(window=1 << 12, threshold=3, max_windows=2)(plain)
+    lo = 10**12
+    got = [cached(n) for n in range(lo, lo + 3 * 4096)]
+    assert got == [plain(n) for n in range(lo, lo + 3 * 4096)], "window mismatch"
+    info = cached.cache_info()
+    assert info.currsize == 2 and info.misses <= 4 * 3, info
+    print(f"✓ Window cache OK ({info.hits} hits, {info.misses} misses)")
+
+    assert [cached(n) for n in range(1, 200)] == [g11.is_prime(n) for n in range(1, 200)]
+    calls.clear()
+    assert cached(lo + 1) == plain(lo + 1) and len(calls) == 2   # evicted: miss again
+    print("✓ Low window and LRU eviction OK")
+
+    for fresh in (cached, window_cache()(g11.is_prime.__wrapped__)):
+        fresh.cache_clear()
+        assert [fresh(n) for n in (-5, -1, -(1 << 20), 0, 2)] == [False] * 4 + [True]
+    print("✓ Negative input OK")
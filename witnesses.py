@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Witness tables for gen11's tiered Miller-Rabin - generation and validation.
+
+gen11 picks its bases per call from n.bit_length() (_WITNESS_TIERS). Below
+2^32 it runs base 2 plus one hashed base, _HASH_BASES[_hash32(n)], chosen so
+that no base-2 strong pseudoprime in that hash bucket survives it (the
+two-base variant of Forisek & Jancina's hashed MR). That table is only as
+good as the list of spsp(2) < 2^32, so both are reproducible from here.
+
+    python3 witnesses.py          validate (spsp(2) enumerated to 10^8)
+    python3 witnesses.py --full   validate against every spsp(2) < 2^32 (~40 min)
+    python3 witnesses.py --build  enumerate to 2^32 and print a fresh table
+
+NumPy is required.
+"""
+import numpy as np
+
+import gen11_segmented as g11
+from mr_batch import _mr32
+
+# Strong pseudoprimes to base 2 below 10^k, k = 4..10 (OEIS A072276).
+SPSP2_COUNTS = {10**4: 5, 10**5: 16, 10**6: 46, 10**7: 162, 10**8: 488,
+                10**9: 1282, 10**10: 3291}
+
+def spsp2(limit, chunk=1 << 22):
+    """Every odd composite n < min(limit, 4759123141) that passes MR base 2."""
+    assert limit <= 4_759_123_141, "{2, 7, 61} no longer certifies primes"
+    found = []
+    for lo in range(63, limit, 2 * chunk):
+        n = np.arange(lo, min(lo + 2 * chunk, limit), 2, dtype=np.uint64)
+        cand = n[_mr32(n, (2,))]
+        found.extend(cand[~_mr32(cand, (7, 61))].tolist())
+    return found
+
+def build_hash_bases(pseudoprimes, buckets=256):
+    """Smallest base >= 3 per bucket that is a witness for every n in it."""
+    table = []
+    groups = [[] for _ in range(buckets)]
+    for n in pseudoprimes:
+        groups[g11._hash32(n)].append(n)
+    for group in groups:
+        base = 3
+        while any(g11._miller_rabin(n, (base,)) for n in group):
+            base += 1
+        table.append(base)
+    return tuple(table)
+
+def _check_tier_bounds():
+    """Each tier's bound is the least strong pseudoprime to its bases: it must
+    pass them (so the constants are typed right) and fail the next tier."""
+    for (bound, bases), (_, nxt) in zip(g11._WITNESS_TIERS, g11._WITNESS_TIERS[1:]):
+        if bases is None or bound == 1 << 64: continue
+        assert g11._miller_rabin(bound, bases), f"{bound} should pass {bases}"
+        assert not g11._miller_rabin(bound), f"{bound} not rejected"
+        assert not g11._miller_rabin(bound, nxt), f"{bound} passes {nxt}"
+
+def _check_against_sieve(limit):
+    """Tiered _miller_rabin agrees with the sieve on every odd n < limit."""
+    for lo in range(3, limit, 1 << 20):
+        for n in range(lo, min(lo + (1 << 20), limit), 2):
+            if g11._miller_rabin(n) != g11._sieve_has(n):
+                raise AssertionError(f"tiered MR wrong at {n}")
+
+if __name__ == "__main__":
+    import sys, time
+
+    start = time.perf_counter()
+    _check_tier_bounds()
+    print(f"✓ Tier bounds are tight strong pseudoprimes ({time.perf_counter()-start:.2f}s)")
+
+    start = time.perf_counter()
+    _check_against_sieve(10**7)
+    print(f"✓ Tiered MR == sieve for every odd n < 10^7 ({time.perf_counter()-start:.1f}s)")
+
+    limit = 1 << 32 if {"--full", "--build"} & set(sys.argv) else 10**8
+    start = time.perf_counter()
+    pseudo = spsp2(limit)
+    for bound, count in SPSP2_COUNTS.items():
+        if bound <= limit:
+            assert sum(n < bound for n in pseudo) == count, f"spsp(2) count below {bound}"
+    print(f"✓ {len(pseudo)} spsp(2) < {limit} enumerated, counts match A072276 "
+          f"({time.perf_counter()-start:.1f}s)")
+
+    if "--build" in sys.argv:
+        print(build_hash_bases(pseudo))
+        sys.exit()
+    for n in pseudo:
+        assert not g11._miller_rabin(n), f"tiered MR passes spsp(2) {n}"
+    print(f"✓ Tiered MR rejects every spsp(2) < {limit}")
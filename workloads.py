@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark workloads - seeded, replayable streams of is_prime queries.
+
+Every generator takes (count, seed) and returns a list of ints; the same
+seed gives the same stream on every machine and Python version (random.Random
+with integer draws only).
+    uniform32 / uniform64   integers drawn uniformly below 2^32 / 2^64
+    rsa512                  odd 512-bit candidates with the top two bits set
+    zipf                    Zipf(1.1) repeats over 10^5 odd IDs above 10^9
+    windows                 queries inside a 10^4-wide window that slides
+                            up by 16 per query from 10^9
+    adversarial             strong pseudoprimes to bases 2, 3, 5 and 7: they
+                            fool gen4-gen6 and run every Miller-Rabin round
+Streams are saved as text (a "# name key=value ..." header line, then one
+integer per line) and replayed with load().
+
+    python3 workloads.py DIR [count] [seed]     write every workload to DIR
+"""
+import random
+from pathlib import Path
+
+# Composites that are strong probable primes to bases 2, 3, 5 and 7
+# (OEIS A074773), checked against gen11's deterministic test below.
+SPSP_2357 = (3215031751, 118670087467, 307768373641, 315962312077, 354864744877,
+             457453568161, 528929554561, 546348519181, 602248359169, 1362242655901,
+             1871186716981, 2152302898747, 2273312197621, 2366338900801)
+
+def uniform(bits, count, seed=0):
+    rng = random.Random(seed)
+    return [rng.getrandbits(bits) for _ in range(count)]
+
+def rsa_candidates(bits, count, seed=0):
+    """Odd bits-bit integers with the top two bits set, like RSA prime candidates."""
+    rng = random.Random(seed)
+    top = 3 << (bits - 2)
+    return [rng.getrandbits(bits) | top | 1 for _ in range(count)]
+
+def zipf(count, seed=0, universe=10**5, s=1.1, low=10**9):
+    rng = random.Random(seed)
+    ranks = range(1, universe + 1)
+    return [low + 2 * r + 1 for r in rng.choices(ranks, [r ** -s for r in ranks], k=count)]
+
+def sliding_windows(count, seed=0, width=10**4, step=16, start=10**9):
+    rng = random.Random(seed)
+    return [start + i * step + rng.randrange(width) for i in range(count)]
+
+def adversarial(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(SPSP_2357) for _ in range(count)]
+
+WORKLOADS = {
+    "uniform32": lambda count, seed: uniform(32, count, seed),
+    "uniform64": lambda count, seed: uniform(64, count, seed),
+    "rsa512": lambda count, seed: rsa_candidates(512, count, seed),
+    "zipf": zipf,
+    "windows": sliding_windows,
+    "adversarial": adversarial,
+}
+
+def generate(name, count, seed=0):
+    return WORKLOADS[name](count, seed)
+
+def save(path, name, numbers, **meta):
+    meta = " ".join(f"{k}={v}" for k, v in meta.items())
+    with open(path, "w") as f:
+        f.write(f"# {name} {meta}".rstrip() + "\n")
+        f.writelines(f"{n}\n" for n in numbers)
+
+def load(path):
+    """(name, numbers, meta) from a file written by save()."""
+    with open(path) as f:
+        name, *fields = f.readline()[1:].split()
+        numbers = [int(line) for line in f if line.strip()]
+    return name, numbers, dict(field.split("=", 1) for field in fields)
+
+def write_all(directory, count, seed=0):
+    """Save every workload as DIR/NAME.txt; returns {name: path}."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name in WORKLOADS:
+        paths[name] = directory / f"{name}.txt"
+        save(paths[name], name, generate(name, count, seed), count=count, seed=seed)
+    return paths
+
+if __name__ == "__main__":
+    import sys
+    import gen11_segmented as g11
+
+    assert all(g11._miller_rabin(n, (2, 3, 5, 7)) and not g11.is_prime(n) for n in SPSP_2357)
+    assert generate("zipf", 50, 3) == generate("zipf", 50, 3)
+    assert all(n.bit_length() == 512 and n & 1 for n in generate("rsa512", 20))
+    print("✓ Workloads OK")
+    if len(sys.argv) > 1:
+        count = int(float(sys.argv[2])) if len(sys.argv) > 2 else 10_000
+        seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+        for name, path in write_all(sys.argv[1], count, seed).items():
+            assert load(path)[1] == generate(name, count, seed)
+            print(f"  {name:<12} -> {path}")